@@ -0,0 +1,116 @@
+"""Sequential vs concurrent vs conditional DOSM refreshes.
+
+Serves the fixture parquet files from a local HTTP stand-in for DOSM, which
+answers every request after a delay and supports ETag / If-None-Match:
+
+    python benchmarks/fetch.py --delay 0.2
+"""
+
+import argparse
+import hashlib
+import http.server
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class StandIn(http.server.BaseHTTPRequestHandler):
+    # Set per server by start_stand_in
+    directory = None
+    delay = 0.0
+    bytes_sent = 0
+    # (path, If-None-Match) of every request
+    requests = None
+
+    def do_GET(self):
+        self.requests.append((self.path, self.headers.get("If-None-Match")))
+        time.sleep(self.delay)
+        path = os.path.join(self.directory, os.path.basename(self.path))
+        if not os.path.exists(path):
+            self.send_error(404)
+            return
+
+        with open(path, "rb") as f:
+            content = f.read()
+        etag = '"' + hashlib.sha256(content).hexdigest()[:16] + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+        type(self).bytes_sent += len(content)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stand_in(directory, delay=0.0):
+    """Serve the files in directory on a free local port, see StandIn.
+
+    Returns:
+        The server, its handler class is server.handler.
+    """
+    # A class of its own, so servers do not share their counters
+    handler = type("StandIn", (StandIn,), {
+        "directory": directory, "delay": delay, "bytes_sent": 0, "requests": []})
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.handler = handler
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def timed(server, fn):
+    server.handler.bytes_sent = 0
+    started = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - started) * 1000, server.handler.bytes_sent, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--delay", type=float, default=0.2)
+    args = parser.parse_args()
+
+    served_dir = tempfile.mkdtemp(prefix="econome-dosm-")
+    cache_dir = tempfile.mkdtemp(prefix="econome-cache-")
+    server = start_stand_in(served_dir, args.delay)
+
+    # The dataset cache is configured at import
+    os.environ["ECONOME_DOSM_MIRROR"] = f"http://127.0.0.1:{server.server_port}"
+    os.environ["ECONOME_DATA_DIR"] = cache_dir
+    os.environ["ECONOME_OFFLINE"] = "0"
+    os.environ.setdefault("ECONOME_LOG_SPANS", "0")
+    sys.path.insert(0, ROOT)
+
+    from benchmarks.fixtures import write_fixtures
+    from pynecone import datasets
+
+    write_fixtures(served_dir)
+
+    sequential_ms, sequential_bytes, _ = timed(
+        server, lambda: [datasets.dataset_path(url, refresh=True) for url in datasets.ALL_URLS])
+    shutil.rmtree(cache_dir)
+
+    concurrent_ms, concurrent_bytes, _ = timed(server, lambda: datasets.fetch_all(refresh=True))
+    conditional_ms, conditional_bytes, results = timed(
+        server, lambda: datasets.fetch_all(refresh=True))
+
+    print(f"{'sequential, cold':<28} {sequential_ms:8.1f} ms {sequential_bytes:>9} bytes")
+    print(f"{'concurrent, cold':<28} {concurrent_ms:8.1f} ms {concurrent_bytes:>9} bytes")
+    print(f"{'concurrent, not modified':<28} {conditional_ms:8.1f} ms {conditional_bytes:>9} bytes")
+    for url, result in results.items():
+        print(f"  {os.path.basename(url):<32} {result['status']:<13} "
+              f"{result['seconds'] * 1000:8.1f} ms")
+
+    server.shutdown()
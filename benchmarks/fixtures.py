@@ -0,0 +1,46 @@
+"""Synthetic stand-ins for the DOSM parquet files, for offline benchmarks.
+
+The files have the same names and the columns the app reads, with monthly
+trending, seasonal values, so the whole pipeline runs without the network.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from pynecone import datasets
+
+START = "2010-01-01"
+END = "2023-06-01"
+
+COLUMNS = {
+    datasets.URL_ECON_INDICATOR: ["leading", "coincident", "lagging"],
+    datasets.URL_CPI: ["overall", "food"],
+    datasets.URL_IPI: ["overall", "mfg", "electric", "mining"],
+    datasets.URL_PPI: ["overall", "agriculture", "mining", "manufacturing",
+                       "electricity", "water"],
+    datasets.URL_LABOUR: ["unemployed", "employed", "lf"],
+}
+
+
+def series(rng, months, level):
+    trend = level * (1 + 0.002 * np.arange(months))
+    season = 0.01 * level * np.sin(2 * np.pi * np.arange(months) / 12)
+    noise = rng.normal(0, 0.002 * level, months)
+    return trend + season + noise
+
+
+def write_fixtures(directory, seed=0):
+    """Write one parquet file per DOSM URL into directory."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(START, END, freq="MS")
+    os.makedirs(directory, exist_ok=True)
+
+    for url, columns in COLUMNS.items():
+        df = pd.DataFrame({"date": dates.strftime("%Y-%m-%d")})
+        for i, column in enumerate(columns):
+            # DOSM publishes one decimal
+            df[column] = series(rng, len(dates), 100 + 50 * i).round(1)
+        df.to_parquet(os.path.join(directory, os.path.basename(url)), index=False)
+    return directory
@@ -0,0 +1,62 @@
+"""Report how long each module takes to import in a fresh interpreter.
+
+pynecone.model reads the DOSM data at import, the interpreters are pointed at
+the offline fixtures so the import is timed instead of the downloads:
+
+    python benchmarks/import_time.py
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    "pandas",
+    "pynecone.datasets",
+    "pynecone.model",
+    "pynecone.state",
+    "statsmodels.tsa.seasonal",
+    "sklearn.preprocessing",
+    "tensorflow",
+]
+
+SNIPPET = """
+import time
+started = time.perf_counter()
+import {module}
+print(time.perf_counter() - started)
+"""
+
+
+def import_time(module):
+    # A fresh process each time so nothing is already in sys.modules
+    result = subprocess.run(
+        [sys.executable, "-c", SNIPPET.format(module=module)],
+        capture_output=True, text=True, cwd=ROOT,
+    )
+    if result.returncode != 0:
+        return None
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    # Inherited by every interpreter below, like benchmarks/run.py sets it up
+    fixture_dir = tempfile.mkdtemp(prefix="econome-import-")
+    os.environ["ECONOME_DATA_DIR"] = fixture_dir
+    os.environ["ECONOME_OFFLINE"] = "1"
+    os.environ.setdefault("ECONOME_LOG_SPANS", "0")
+    sys.path.insert(0, ROOT)
+
+    from benchmarks.fixtures import write_fixtures
+
+    write_fixtures(fixture_dir)
+
+    for module in MODULES:
+        seconds = import_time(module)
+        if seconds is None:
+            print(f"{module:<28} failed to import")
+        else:
+            print(f"{module:<28} {seconds * 1000:10.1f} ms")
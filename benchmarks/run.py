@@ -0,0 +1,189 @@
+"""Benchmarks for the forecast and simulation hot paths.
+
+Runs fully offline against synthetic fixture parquet files and writes the
+timings as JSON, so runs can be compared across commits:
+
+    python benchmarks/run.py --output benchmark_results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The dataset cache is configured at import, point it at the fixtures first
+FIXTURE_DIR = tempfile.mkdtemp(prefix="econome-bench-")
+os.environ["ECONOME_DATA_DIR"] = FIXTURE_DIR
+os.environ["ECONOME_OFFLINE"] = "1"
+os.environ.setdefault("ECONOME_LOG_SPANS", "0")
+# The fixtures are synthetic, fit the scalers on them instead of the saved bundle
+os.environ["ECONOME_ALLOW_REFIT"] = "1"
+
+os.chdir(ROOT)
+sys.path.insert(0, ROOT)
+
+import numpy as np  # noqa: E402
+
+from benchmarks.fixtures import write_fixtures  # noqa: E402
+
+write_fixtures(FIXTURE_DIR)
+
+from pynecone import advice, datasets, figures, model, simulation  # noqa: E402
+from pynecone.features import build_windows, centered_trend  # noqa: E402
+
+PORTFOLIO_SIZES = [1, 10, 100, 1000]
+
+
+def measure(fn, repeat):
+    fn()  # warm up
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        "runs": repeat,
+        "mean_ms": statistics.mean(timings),
+        "median_ms": statistics.median(timings),
+        "min_ms": min(timings),
+        "max_ms": max(timings),
+    }
+
+
+def synthetic_loans(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            "name": f"Loan {i}",
+            "sym": f"{rng.integers(2023, 2026)}/{rng.integers(1, 13):02d}",
+            "loan": str(rng.integers(1000, 500000)),
+            "interest": str(rng.integers(1, 10)),
+            "installment": str(rng.integers(6, 361)),
+        }
+        for i in range(count)
+    ]
+
+
+def legacy_windows(data):
+    # The iloc loop build_windows replaced, kept for comparison
+    X, y = [], []
+    for i in range(len(data) - model.max_forecast_months):
+        X.append(data[model.input_columns].iloc[i])
+        y.append([data[model.target_column].iloc[i + j].iloc[0]
+                  for j in model.target_forecast_months])
+    return np.array(X), np.array(y)
+
+
+def legacy_trends(data):
+    # The per column seasonal_decompose centered_trend replaced
+    from statsmodels.tsa.seasonal import seasonal_decompose
+
+    return [seasonal_decompose(data[column], model='additive', period=12).trend
+            .ffill().bfill() for column in model.TREND_COLUMNS]
+
+
+def flat_forecast(start_year, start_month, num_of_months):
+    # Keeps the portfolio benchmarks about the simulation, not the model
+    return [0.2] * num_of_months
+
+
+def flat_scenarios(start_year, start_month, num_of_months, samples=2000):
+    rng = np.random.default_rng(0)
+    return 0.2 + rng.normal(0, 0.1, (samples, num_of_months))
+
+
+def create_figures(loans_from_user, household_income=8000, monthly_expenses=3000):
+    # Everything State.create_figures and the worker do for a submission
+    loans = [simulation.parse_loan(loanData) for loanData in loans_from_user]
+    sim = simulation.simulate(loans, household_income, monthly_expenses, flat_forecast)
+    figures.income_vs_expenses(sim)
+    figures.expenses_breakdown(sim, monthly_expenses)
+    advice.build_prompt(household_income, monthly_expenses, sim.initial_disposal,
+                        [sim.start_month, sim.start_year], sim.final_disposal,
+                        [sim.end_month, sim.end_year], loans_from_user)
+    return sim
+
+
+def run(repeat):
+    results = {}
+    data = model.read_data()
+
+    results["read_gov_data[all]"] = measure(
+        lambda: model.read_gov_data(datasets.URL_PPI), repeat)
+    results["read_gov_data[used]"] = measure(
+        lambda: model.read_gov_data(datasets.URL_PPI, model.USED_COLUMNS[datasets.URL_PPI],
+                                    model.start_date, model.end_date), repeat)
+    results["build_features"] = measure(model.build_features, repeat)
+    results["read_data"] = measure(model.read_data, repeat)
+    results["trends_seasonal_decompose"] = measure(lambda: legacy_trends(data), repeat)
+    results["centered_trend"] = measure(
+        lambda: centered_trend(data[list(model.TREND_COLUMNS)].to_numpy()), repeat)
+    results["windows_iloc_loop"] = measure(lambda: legacy_windows(data), repeat)
+    results["build_windows"] = measure(
+        lambda: build_windows(data, model.input_columns, model.target_column,
+                              model.target_forecast_months), repeat)
+
+    try:
+        results["forecast_future_CPI"] = measure(
+            lambda: model.forecast_future_CPI(2020, 1, 120), repeat)
+    except ImportError as e:
+        results["forecast_future_CPI"] = {"skipped": str(e)}
+    try:
+        results["forecast_scenarios"] = measure(
+            lambda: model.forecast_scenarios(2020, 1, 120), repeat)
+    except ImportError as e:
+        results["forecast_scenarios"] = {"skipped": str(e)}
+
+    for size in PORTFOLIO_SIZES:
+        loans_from_user = synthetic_loans(size)
+        loans = [simulation.parse_loan(loanData) for loanData in loans_from_user]
+        sim = simulation.simulate(loans, 8000, 3000, flat_forecast)
+
+        results[f"create_figures[{size}]"] = measure(
+            lambda: create_figures(loans_from_user), repeat)
+        results[f"simulate[{size}]"] = measure(
+            lambda: simulation.simulate(loans, 8000, 3000, flat_forecast), repeat)
+        simulator = simulation.Simulator(flat_forecast, scenarios=flat_scenarios)
+        results[f"scenario_bands[{size}]"] = measure(
+            lambda: simulator.scenario_bands(sim, 8000, 3000), repeat)
+        results[f"figure_income_vs_expenses[{size}]"] = measure(
+            lambda: figures.income_vs_expenses(sim), repeat)
+        results[f"figure_expenses_breakdown[{size}]"] = measure(
+            lambda: figures.expenses_breakdown(sim, 3000), repeat)
+
+    return results
+
+
+def git_commit():
+    result = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True)
+    return result.stdout.strip() or None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": run(args.repeat),
+    }
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for name, timing in report["results"].items():
+        if "skipped" in timing:
+            print(f"{name:<40} skipped ({timing['skipped']})")
+        else:
+            print(f"{name:<40} {timing['median_ms']:10.3f} ms")
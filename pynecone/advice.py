@@ -0,0 +1,167 @@
+"""Financial advice from an LLM, generated off the event handler."""
+
+import asyncio
+import collections
+import hashlib
+import json
+import os
+import urllib.request
+
+from pynecone import telemetry
+
+BARD_TOKEN = os.environ.get(
+    "BARD_API_KEY",
+    "dQgos0qcETfjjxFRvMxixNiEwNVgfaxv1H5iWg_iqf4Z3xGJzSwGBWDY86-rucBaZOYCgA.",
+)
+
+# Set ECONOME_ADVICE_URL to send prompts to a plain HTTP endpoint instead of
+# Bard, e.g. a local stub server that answers {"content": "..."}
+ADVICE_URL = os.environ.get("ECONOME_ADVICE_URL")
+ADVICE_TIMEOUT = float(os.environ.get("ECONOME_ADVICE_TIMEOUT", 30))
+
+# Answers are cached by scenario, optionally persisted to a JSON file
+ADVICE_CACHE_SIZE = int(os.environ.get("ECONOME_ADVICE_CACHE_SIZE", 256))
+ADVICE_CACHE_PATH = os.environ.get("ECONOME_ADVICE_CACHE")
+
+# The in flight request of every session, so a resubmit can cancel it
+_pending = {}
+
+_cache = None
+cache_stats = {"hits": 0, "misses": 0}
+
+
+def build_prompt(household_income, monthly_expenses, initial_disposal, initial_date, final_disposal, final_date, loans):
+    prompt = f"Given the following financial data, assess the feasiblity of someone with a monthly household income of RM{household_income} and monthly expesnes of RM{monthly_expenses} affording the following loans. Provide professional financial advice on whether or not they should take these loans. Consider the change in disposal income from RM{'{:.2f}'.format(initial_disposal)} in {initial_date[1]}/{initial_date[0]} to RM{'{:.2f}'.format(final_disposal)} in {final_date[1]}/{final_date[0]} after accounting for inflation.\n"
+
+    for loanData in loans:
+        prompt += f"{loanData['name']} "
+        prompt += f"Date: {loanData['sym']} "
+        prompt += f"Loan Value: RM{loanData['loan']} "
+        prompt += f"Interest Rate: {loanData['interest']}% "
+        prompt += f"Installment Period: {loanData['installment']} months\n"
+
+    prompt += "Analyze the financial impact of these loans on the individual's budget, considering the gradual reduction in dosposable income and the long-term implications of managing these loans alongside other living expenses. Don't give additional number analysis and calculations, just paragraph of words and only in one short paragraphs"
+    return prompt
+
+
+def _number(value):
+    return round(float(str(value).strip().replace(",", "")), 2)
+
+
+def cache_key(household_income, monthly_expenses, initial_disposal, initial_date, final_disposal, final_date, loans):
+    """Canonical hash of everything that goes into the prompt.
+
+    Formatting differences (spacing, "5" vs "5.0", loan order) map to the
+    same key, so equivalent scenarios share one answer.
+    """
+    canonical_loans = sorted(
+        [loanData["name"].strip(), loanData["sym"].strip(), _number(loanData["loan"]),
+         _number(loanData["interest"]), _number(loanData["installment"])]
+        for loanData in loans
+    )
+    canonical = {
+        "income": _number(household_income),
+        "expenses": _number(monthly_expenses),
+        "initial": [_number(initial_disposal), list(initial_date)],
+        "final": [_number(final_disposal), list(final_date)],
+        "loans": canonical_loans,
+    }
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True).encode()).hexdigest()
+
+
+def _load_cache():
+    global _cache
+
+    if _cache is None:
+        _cache = collections.OrderedDict()
+        if ADVICE_CACHE_PATH and os.path.exists(ADVICE_CACHE_PATH):
+            with open(ADVICE_CACHE_PATH) as f:
+                _cache.update(json.load(f))
+    return _cache
+
+
+def _save_cache():
+    if not ADVICE_CACHE_PATH:
+        return
+    tmp_path = ADVICE_CACHE_PATH + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(_cache, f)
+    os.replace(tmp_path, ADVICE_CACHE_PATH)
+
+
+def cached_answer(key):
+    cache = _load_cache()
+    if key in cache:
+        cache.move_to_end(key)
+        cache_stats["hits"] += 1
+        return cache[key]
+    cache_stats["misses"] += 1
+    return None
+
+
+def store_answer(key, answer):
+    cache = _load_cache()
+    cache[key] = answer
+    cache.move_to_end(key)
+    while len(cache) > ADVICE_CACHE_SIZE:
+        cache.popitem(last=False)
+    _save_cache()
+
+
+def get_answer(prompt):
+    # Blocking, always run it through ask() from the event loop
+    if ADVICE_URL:
+        request = urllib.request.Request(
+            ADVICE_URL,
+            data=json.dumps({"prompt": prompt}).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request, timeout=ADVICE_TIMEOUT) as response:
+            return json.load(response)["content"]
+
+    from bardapi import Bard
+
+    bard = Bard(BARD_TOKEN)
+    return bard.get_answer(prompt)["content"]
+
+
+async def ask(session, prompt, key=None, timeout=ADVICE_TIMEOUT):
+    """Get advice for a prompt without blocking the event loop.
+
+    A newer call for the same session cancels the older one. Answers for a
+    key seen before come straight from the cache.
+
+    Args:
+        session: Key of the session asking, usually the client token.
+        prompt: The prompt to send.
+        key: The cache key from cache_key, None to skip the cache.
+        timeout: Seconds to wait before giving up.
+
+    Returns:
+        The advice text.
+
+    Raises:
+        asyncio.CancelledError: A newer request for the session replaced this one.
+        asyncio.TimeoutError: No answer within the timeout.
+    """
+    previous = _pending.pop(session, None)
+    if previous is not None:
+        previous.cancel()
+
+    if key is not None:
+        answer = cached_answer(key)
+        if answer is not None:
+            return answer
+
+    task = asyncio.ensure_future(
+        asyncio.wait_for(asyncio.to_thread(get_answer, prompt), timeout))
+    _pending[session] = task
+    try:
+        with telemetry.span("llm_call"):
+            answer = await task
+        if key is not None:
+            store_answer(key, answer)
+        return answer
+    finally:
+        if _pending.get(session) is task:
+            del _pending[session]
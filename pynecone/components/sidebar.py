@@ -179,16 +179,37 @@ def new_loan() -> rx.Component:
         on_submit=State.add_item,
     )
 
+
+def import_loans() -> rx.Component:
+    """Render the form to paste many loans at once.
+
+    Returns:
+        A form taking one loan per CSV line.
+    """
+    return rx.form(
+        rx.text("Import Loans (CSV)",
+                class_name="text-black-500 font-bold mb-2 mt-4"),
+        rx.text_area(
+            placeholder="name, 2023/05, amount, interest, months (one loan per line)",
+            id="loans_csv"),
+        rx.text(State.import_errors, color="red", white_space="pre-line"),
+        rx.center(
+            rx.button("Import", type_="submit", bg="green",
+                      color="white", margin_top="1rem"),
+        ),
+        on_submit=State.import_loans,
+    )
+
 # Major Expenses section
 
 
-def todo_loan(item: rx.Var[str]) -> rx.Component:
+def todo_loan(item: rx.Var[list[str]]) -> rx.Component:
     """Render an item in the todo list.
 
-    NOTE: When using `rx.foreach`, the item will be a Var[str] rather than a str.
+    NOTE: When using `rx.foreach`, the item will be a Var rather than a list.
 
     Args:
-        item: The todo list item.
+        item: The todo list item, [loan id, loan html].
 
     Returns:
         A single rendered todo list item.
@@ -201,13 +222,13 @@ def todo_loan(item: rx.Var[str]) -> rx.Component:
 
 
         # The item text.
-        rx.html(item),  # Assuming item is a string containing HTML content
+        rx.html(item[1]),  # Assuming item is a string containing HTML content
 
         # A button to finish the item.
         rx.spacer(),  # Add a spacer to push the button to the right
         rx.button(
             "❌",
-            on_click=lambda: State.finish_item(item),
+            on_click=lambda: State.finish_item(item[0]),
             height="10em",
             background_color="#f4f4f4",
             text_color="white",
@@ -265,6 +286,7 @@ def sidebar() -> rx.Component:
 
                     loans_list(),
                     new_loan(),
+                    import_loans(),
 
                     padding="1rem",
                     background_color="white",
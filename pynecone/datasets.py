@@ -0,0 +1,267 @@
+"""Local on-disk cache for the DOSM parquet datasets."""
+
+import concurrent.futures
+import contextlib
+import hashlib
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+
+try:
+    import fcntl
+except ImportError:  # Windows, only the threads of one process are serialized
+    fcntl = None
+
+from pynecone import telemetry
+
+URL_ECON_INDICATOR = 'https://storage.dosm.gov.my/econindicators/economic_indicators.parquet'
+URL_CPI = 'https://storage.dosm.gov.my/cpi/cpi_headline.parquet'
+URL_IPI = 'https://storage.dosm.gov.my/ipi/ipi.parquet'
+URL_PPI = 'https://storage.dosm.gov.my/ppi/ppi.parquet'
+URL_LABOUR = 'https://storage.dosm.gov.my/labour/labourforce_monthly.parquet'
+
+ALL_URLS = [URL_ECON_INDICATOR, URL_CPI, URL_IPI, URL_PPI, URL_LABOUR]
+
+# Where the snapshots live, how long they stay fresh (seconds) and whether we
+# are allowed to touch the network at all. Point ECONOME_DATA_DIR at a folder of
+# fixture parquet files and set ECONOME_OFFLINE=1 to run without DOSM.
+CACHE_DIR = os.environ.get("ECONOME_DATA_DIR", "./.dosm_cache")
+CACHE_TTL = float(os.environ.get("ECONOME_DATA_TTL", 24 * 60 * 60))
+OFFLINE = os.environ.get("ECONOME_OFFLINE", "0") == "1"
+FETCH_TIMEOUT = 30
+# Download from another host with the same paths, e.g. a local HTTP stand-in
+DOSM_HOST = "https://storage.dosm.gov.my"
+MIRROR = os.environ.get("ECONOME_DOSM_MIRROR", "").rstrip("/")
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_LOCK_NAME = "manifest.lock"
+
+# The sources are fetched concurrently, by threads and by every pool worker
+_thread_lock = threading.Lock()
+# path -> ((mtime, size), sha256) of the files hashed on every request
+_hashes = {}
+
+
+@contextlib.contextmanager
+def manifest_lock():
+    """Hold while reading, changing and writing back the manifest.
+
+    Locks the threads of this process and, through a lock file, every other
+    process sharing the cache directory.
+    """
+    with _thread_lock:
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(os.path.join(CACHE_DIR, MANIFEST_LOCK_NAME), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def cache_path(url):
+    return os.path.join(CACHE_DIR, os.path.basename(url))
+
+
+def file_hash(path):
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def cached_file_hash(path):
+    """file_hash, only recomputed when the file's mtime or size changes."""
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    path = os.path.abspath(path)
+    if path not in _hashes or _hashes[path][0] != key:
+        _hashes[path] = (key, file_hash(path))
+    return _hashes[path][1]
+
+
+def read_manifest():
+    path = os.path.join(CACHE_DIR, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_manifest(manifest):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = os.path.join(CACHE_DIR, MANIFEST_NAME)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def source_url(url):
+    if MIRROR and url.startswith(DOSM_HOST):
+        return MIRROR + url[len(DOSM_HOST):]
+    return url
+
+
+def store_snapshot(url, content, etag=None, last_modified=None):
+    # Write to a temporary file first so a half finished download never
+    # replaces the last good snapshot, one per process as the workers share the cache
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = cache_path(url)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+    with manifest_lock():
+        manifest = read_manifest()
+        manifest[url] = {
+            "file": os.path.basename(path),
+            "sha256": hashlib.sha256(content).hexdigest(),
+            "fetched_at": time.time(),
+            "etag": etag,
+            "last_modified": last_modified,
+        }
+        write_manifest(manifest)
+    return path
+
+
+def mark_fresh(url, entry):
+    # DOSM answered 304 to the validators of entry, our snapshot is still the published one
+    with manifest_lock():
+        manifest = read_manifest()
+        manifest[url] = dict(entry, fetched_at=time.time())
+        write_manifest(manifest)
+    return cache_path(url)
+
+
+def fetch(url, manifest=None):
+    """Download url unless the server says our snapshot is current.
+
+    Returns:
+        The snapshot path and "downloaded" or "not_modified".
+    """
+    request = urllib.request.Request(source_url(url))
+    entry = (manifest or {}).get(url)
+    # Only ask conditionally when the snapshot on disk is the one the validators describe
+    if entry is not None and is_valid_snapshot(url, manifest):
+        if entry.get("etag"):
+            request.add_header("If-None-Match", entry["etag"])
+        if entry.get("last_modified"):
+            request.add_header("If-Modified-Since", entry["last_modified"])
+
+    try:
+        with urllib.request.urlopen(request, timeout=FETCH_TIMEOUT) as response:
+            content = response.read()
+            headers = response.headers
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return mark_fresh(url, entry), "not_modified"
+        raise
+    path = store_snapshot(url, content, etag=headers.get("ETag"),
+                          last_modified=headers.get("Last-Modified"))
+    return path, "downloaded"
+
+
+def is_valid_snapshot(url, manifest):
+    # A snapshot counts only if it exists and still matches its recorded hash
+    entry = manifest.get(url)
+    path = cache_path(url)
+    if not os.path.exists(path):
+        return False
+    if entry is None:
+        # Fixture files dropped into the cache directory by hand
+        return True
+    return file_hash(path) == entry["sha256"]
+
+
+def is_fresh(url, manifest):
+    entry = manifest.get(url)
+    if entry is None:
+        return False
+    return time.time() - entry["fetched_at"] < CACHE_TTL
+
+
+def dataset_path(url, refresh=False):
+    """Return the local path of a DOSM dataset, downloading it if needed.
+
+    Args:
+        url: The DOSM parquet URL.
+        refresh: Ignore the TTL and download a new snapshot.
+
+    Returns:
+        The path to the local parquet snapshot.
+    """
+    return resolve(url, refresh)[0]
+
+
+def resolve(url, refresh=False):
+    # dataset_path, also saying whether the snapshot was "cached",
+    # "downloaded", "not_modified" or "stale" (DOSM unreachable)
+    manifest = read_manifest()
+    valid = is_valid_snapshot(url, manifest)
+
+    if OFFLINE:
+        if not valid:
+            raise FileNotFoundError(
+                f"No cached snapshot of {url} in {CACHE_DIR} (offline mode)")
+        return cache_path(url), "cached"
+
+    if valid and not refresh and (is_fresh(url, manifest) or url not in manifest):
+        return cache_path(url), "cached"
+
+    try:
+        return fetch(url, manifest)
+    except OSError as e:
+        # DOSM unreachable, serve the last good snapshot if there is one
+        if valid:
+            print(f"Could not refresh {url} ({e}), using cached snapshot")
+            return cache_path(url), "stale"
+        raise
+
+
+def fetch_all(urls=ALL_URLS, refresh=False):
+    """Resolve every dataset at once, so a refresh takes as long as the slowest.
+
+    Args:
+        urls: The DOSM parquet URLs.
+        refresh: Ignore the TTL and ask DOSM for every dataset.
+
+    Returns:
+        url -> {"path", "status", "seconds"} for every url.
+    """
+    def timed(url):
+        started = time.perf_counter()
+        with telemetry.span("dataset_fetch", source=os.path.basename(url)) as fields:
+            path, fields["status"] = resolve(url, refresh)
+        return {"path": path, "status": fields["status"],
+                "seconds": time.perf_counter() - started}
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(urls) or 1) as executor:
+        futures = {url: executor.submit(timed, url) for url in urls}
+        return {url: future.result() for url, future in futures.items()}
+
+
+def content_hash(url):
+    """The sha256 of the cached snapshot of a dataset."""
+    entry = read_manifest().get(url)
+    if entry is not None:
+        return entry["sha256"]
+    return cached_file_hash(dataset_path(url))
+
+
+def refresh_all(urls=ALL_URLS):
+    """Manually check DOSM for a new snapshot of every dataset."""
+    return fetch_all(urls, refresh=True)
+
+
+if __name__ == "__main__":
+    for url, result in refresh_all().items():
+        print(f"{result['path']:<50} {result['status']:<13} {result['seconds'] * 1000:8.1f} ms")
@@ -0,0 +1,120 @@
+"""Feature helpers shared by the training notebook and the server."""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def build_windows(data, input_columns, target_column, horizons):
+    """Build the supervised (X, y) pairs used to train the CPI model.
+
+    Row i of X holds the input columns at month i, row i of y holds the
+    target at month i + h for every horizon h. Equivalent to looping over
+    data.iloc but done with a strided view instead of per row indexing.
+
+    Args:
+        data: The feature frame from read_data.
+        input_columns: The columns used as model inputs.
+        target_column: The target column name (or a one element list).
+        horizons: The forecast horizons in months, e.g. [3, 6, 9, 12].
+
+    Returns:
+        X with shape (samples, len(input_columns)) and y with shape
+        (samples, len(horizons)).
+    """
+    if not isinstance(target_column, str):
+        target_column = target_column[0]
+
+    horizons = np.asarray(horizons)
+    max_horizon = int(horizons.max())
+    samples = max(len(data) - max_horizon, 0)
+
+    X = data[input_columns].to_numpy()[:samples]
+
+    # Each window is target[i : i + max_horizon + 1], pick the horizons out of it
+    target = data[target_column].to_numpy()
+    if samples == 0:
+        return X, np.empty((0, len(horizons)), dtype=target.dtype)
+    windows = sliding_window_view(target, max_horizon + 1)[:samples]
+    y = windows[:, horizons]
+    return X, y
+
+
+# Chronological split of the windows, see training.split_dataset. Only the
+# test windows are never seen while fitting, train and val are shuffled together
+TRAIN_RATIO = 0.6
+VAL_RATIO = 0.2
+TEST_RATIO = 0.2
+
+
+def test_start(samples):
+    """Index of the first test window out of samples windows."""
+    return int(samples * TRAIN_RATIO) + int(samples * VAL_RATIO)
+
+
+# The trend of an additive seasonal_decompose with period 12 is a centered
+# 2x12 moving average: half weight on the two months 6 away, full weight between
+TREND_PERIOD = 12
+TREND_HALF = TREND_PERIOD // 2
+TREND_WEIGHTS = np.r_[0.5, np.ones(TREND_PERIOD - 1), 0.5] / TREND_PERIOD
+
+
+def _fill_edges(trend):
+    # Same as ffill then bfill, only the first and last TREND_HALF months are missing
+    if len(trend) > 2 * TREND_HALF:
+        trend[:TREND_HALF] = trend[TREND_HALF]
+        trend[-TREND_HALF:] = trend[-TREND_HALF - 1]
+    return trend
+
+
+def centered_trend(values):
+    """Trend of every column, as seasonal_decompose(period=12).trend would give.
+
+    All columns go through a single strided moving average instead of one
+    decomposition each. The months without a full window are filled from the
+    nearest computed month.
+
+    Args:
+        values: Monthly values, shape (months, columns).
+
+    Returns:
+        The trends, same shape as values.
+    """
+    values = np.asarray(values, dtype=float)
+    trend = np.full(values.shape, np.nan)
+    if len(values) > 2 * TREND_HALF:
+        windows = sliding_window_view(values, len(TREND_WEIGHTS), axis=0)
+        trend[TREND_HALF:-TREND_HALF] = windows @ TREND_WEIGHTS
+    return _fill_edges(trend)
+
+
+def extend_trend(values, trend, new_values):
+    """Trend after new months are appended, only recomputing what changed.
+
+    A new month only completes the windows of the TREND_HALF months before
+    it, everything earlier keeps its value.
+
+    Args:
+        values: The monthly values the trend was computed from, (months, columns).
+        trend: Their trend from centered_trend or extend_trend.
+        new_values: The months to append, (new months, columns).
+
+    Returns:
+        The values and the trend with the new months appended.
+    """
+    values = np.concatenate([np.asarray(values, dtype=float),
+                             np.asarray(new_values, dtype=float)])
+    if len(new_values) == 0:
+        return values, np.array(trend, dtype=float)
+    if len(trend) <= 2 * TREND_HALF:
+        return values, centered_trend(values)
+
+    # Months from here on had no full window before
+    first = len(trend) - TREND_HALF
+    extended = np.full(values.shape, np.nan)
+    extended[:first] = trend[:first]
+
+    windows = sliding_window_view(
+        values[first - TREND_HALF:], len(TREND_WEIGHTS), axis=0)
+    extended[first:len(values) - TREND_HALF] = windows @ TREND_WEIGHTS
+    extended[-TREND_HALF:] = extended[-TREND_HALF - 1]
+    return values, extended
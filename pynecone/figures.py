@@ -0,0 +1,124 @@
+"""Compact plotly figures for the simulation results.
+
+The figures are pushed over the websocket on every state update, so they
+carry as little as possible: every trace is a y series rounded to cents
+with an evenly spaced date axis (x0 + dx) instead of a list of month labels,
+and the month labels and hover text are formatted by plotly in the browser.
+"""
+
+import numpy as np
+import plotly.graph_objects as go
+
+# One average Gregorian month in milliseconds, the step of the date axis
+MONTH_MS = 2629746000
+# Points sit mid month so drift from the average step never changes the month
+MID_MONTH_MS = 14 * 24 * 60 * 60 * 1000
+
+MONTH_FORMAT = "%Y/%-m"
+
+
+def month_axis(sim):
+    # Milliseconds since the epoch of the first simulated month
+    start = np.datetime64(f"{sim.start_year:04d}-{sim.start_month:02d}-01", "ms")
+    return int(start.astype(np.int64)) + MID_MONTH_MS
+
+
+def series(values):
+    return np.round(np.asarray(values, dtype=float), 2).tolist()
+
+
+def base_layout(**kwargs):
+    return go.Layout(
+        title='Financial Report',
+        xaxis=dict(
+            type="date",
+            dtick="M1",
+            tickformat=MONTH_FORMAT,
+            hoverformat=MONTH_FORMAT,
+        ),
+        height=400,
+        width=600,
+        hovermode="x unified",
+        **kwargs,
+    )
+
+
+def income_vs_expenses(sim) -> go.Figure:
+    x0 = month_axis(sim)
+
+    monthly_income_trace = go.Scatter(x0=x0, dx=MONTH_MS, y=series(sim.real_income), mode='lines',
+                                      name='Real Monthly Income', fill='tozeroy',
+                                      marker=dict(color='green', line=dict(
+                                          color='green', width=2)),
+                                      fillcolor='rgba(0, 255, 0, 0.3)',
+                                      hovertemplate="RM%{y:.2f}")
+    full_expenses_trace = go.Scatter(x0=x0, dx=MONTH_MS, y=series(sim.real_expenses), mode='lines',
+                                     name='Real Monthly Expenses', fill='tozeroy',
+                                     marker=dict(color='red', line=dict(
+                                         color='red', width=2)),
+                                     fillcolor='#ff0000',
+                                     hovertemplate="RM%{y:.2f}")
+
+    traces = [monthly_income_trace, full_expenses_trace]
+    if sim.bands is not None:
+        traces += band(x0, sim.bands, sim.bands.real_income, 'Real Income',
+                       'rgba(0, 128, 0, 0.25)')
+        traces += band(x0, sim.bands, sim.bands.real_expenses, 'Real Expenses',
+                       'rgba(128, 0, 0, 0.35)')
+
+    return go.Figure(
+        data=traces,
+        layout=base_layout(yaxis=dict(range=[0, 20000], dtick=1000)),
+    )
+
+
+def band(x0, bands, values, name, fillcolor):
+    # The lowest and highest percentile, the area between them filled
+    low, high = bands.percentiles[0], bands.percentiles[-1]
+    return [
+        go.Scatter(x0=x0, dx=MONTH_MS, y=series(values[0]), mode='lines',
+                   line=dict(width=0), showlegend=False,
+                   name=f'{name} P{low}', hovertemplate="RM%{y:.2f}"),
+        go.Scatter(x0=x0, dx=MONTH_MS, y=series(values[-1]), mode='lines',
+                   line=dict(width=0), fill='tonexty', fillcolor=fillcolor,
+                   name=f'{name} P{low}-P{high}', hovertemplate="RM%{y:.2f}"),
+    ]
+
+
+def expenses_breakdown(sim, monthly_expenses) -> go.Figure:
+    # Create a stacked chart, with basic neccesity at the bottom, and stacked on top are loans
+    x0 = month_axis(sim)
+    months = len(sim.months)
+
+    tracers = [
+        go.Scatter(x0=x0, dx=MONTH_MS, y=series(np.full(months, monthly_expenses)), mode='lines',
+                   name='Real Basic Neccesity',
+                   marker=dict(color='#ffcc00', line=dict(
+                       color='orange', width=2)),
+                   fillcolor='#ffcc00', stackgroup='one',
+                   hovertemplate="RM%{y:.2f}")
+    ]
+
+    for i, loan in enumerate(sim.loans):
+        tracers.append(
+            go.Scatter(x0=x0 + int(sim.start_offset[i]) * MONTH_MS, dx=MONTH_MS,
+                       y=series(sim.loan_payments(i)), mode='lines',
+                       line=dict(width=2), name=loan.name, stackgroup='one',
+                       hovertemplate="RM%{y:.2f}")
+        )
+
+    # Not drawn, only there so the hover shows the total per month
+    tracers.append(
+        go.Scatter(x0=x0, dx=MONTH_MS, y=series(monthly_expenses + sim.real_loan_total),
+                   mode='lines', line=dict(width=0), showlegend=False,
+                   name='Real Cumulated Expense', hovertemplate="RM%{y:.2f}")
+    )
+
+    return go.Figure(
+        data=tracers,
+        layout=base_layout(
+            hoverlabel=dict(
+                namelength=-1  # Set namelength to -1 to expand hover label size dynamically
+            ),
+        ),
+    )
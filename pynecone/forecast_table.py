@@ -0,0 +1,89 @@
+"""Precomputed CPI forecasts for every valid start month.
+
+Build the table offline with `python -m pynecone.forecast_table` after the
+data or the model changes. The server then answers forecast requests with a
+lookup instead of running the model.
+"""
+
+import os
+
+import numpy as np
+
+from pynecone import datasets, model_bundle, model_registry, simulation
+
+TABLE_PATH = "./pynecone/model/forecast_table.npz"
+
+# (path, version, file mtime) -> the table, {} when missing or stale
+_tables = {}
+
+
+def month_key(date):
+    return date.year * 12 + date.month - 1
+
+
+def table_version(features_key, path=model_registry.MODEL_PATH):
+    # Stale as soon as the source data, the model file or its scalers change
+    return (f"{features_key}-{datasets.cached_file_hash(path)[:16]}"
+            f"-{model_bundle.file_hash(path)[:16]}")
+
+
+def build(path=TABLE_PATH):
+    """Run the model once for every start month and save the results."""
+    import pandas as pd
+    from pynecone import model
+
+    dates = model.read_data().index
+    # The model's latest usable start date
+    last_start = pd.Timestamp(
+        simulation.MODEL_LAST_START_YEAR, simulation.MODEL_LAST_START_MONTH, 1)
+    dates = dates[dates <= last_start]
+    initial_cpi, forecast = model.predict_forecasts(dates)
+
+    np.savez_compressed(
+        path,
+        months=np.array([month_key(date) for date in dates], dtype=np.int32),
+        initial_cpi=initial_cpi,
+        forecast=forecast,
+        version=np.array(table_version(model.features_key)),
+    )
+    return path
+
+
+def load(features_key, path=TABLE_PATH):
+    # Rechecked on every lookup, a model swap or a rebuilt table is picked up
+    version = table_version(features_key)
+    mtime = os.path.getmtime(path) if os.path.exists(path) else None
+    key = (os.path.abspath(path), version, mtime)
+
+    if key not in _tables:
+        table = {}
+        if mtime is not None:
+            with np.load(path) as npz:
+                if str(npz["version"]) == version:
+                    table = {
+                        "rows": {int(m): i for i, m in enumerate(npz["months"])},
+                        "initial_cpi": npz["initial_cpi"],
+                        "forecast": npz["forecast"],
+                    }
+                else:
+                    print(f"{path} is out of date, rebuild it with "
+                          "python -m pynecone.forecast_table")
+        _tables.clear()
+        _tables[key] = table
+    return _tables[key]
+
+
+def lookup(input_dates, features_key):
+    """Return (initial_cpi, forecast) for the dates, or None on a miss."""
+    table = load(features_key)
+    if not table:
+        return None
+
+    rows = [table["rows"].get(month_key(date)) for date in input_dates]
+    if None in rows:
+        return None
+    return table["initial_cpi"][rows], table["forecast"][rows]
+
+
+if __name__ == "__main__":
+    print(build())
@@ -0,0 +1,90 @@
+"""Vectorized real (inflation adjusted) loan payments for a whole portfolio."""
+
+import numpy as np
+
+
+def inflation_factors(predicted_inflation):
+    # Every month shrinks the real value of money by (100 - inflation)%
+    return (100 - np.asarray(predicted_inflation, dtype=float)) / 100
+
+
+def real_loan_payments(installment_payment, start_offset, installment_months, predicted_inflation):
+    """Real monthly payments of every loan, plus their sum per month.
+
+    A loan's first real payment is its installment deflated by the inflation
+    of its first month, every later payment compounds the next month's
+    inflation on top. With C the cumulative product of the monthly factors,
+    payment j of a loan starting at month s is installment * C[s + j] / C[s - 1].
+
+    Args:
+        installment_payment: Nominal monthly installment of each loan, shape (loans,).
+        start_offset: Month index each loan starts at, shape (loans,).
+        installment_months: Number of installments of each loan, shape (loans,).
+        predicted_inflation: Monthly inflation in %, shape (months,).
+
+    Returns:
+        payments, shape (loans, longest loan), zero past each loan's end,
+        and total, shape (months,), the sum of all loans for every month.
+    """
+    installment_payment = np.asarray(installment_payment, dtype=float)
+    start_offset = np.asarray(start_offset, dtype=int)
+    installment_months = np.asarray(installment_months, dtype=int)
+
+    factors = inflation_factors(predicted_inflation)
+    horizon = len(factors)
+    cumulative = np.cumprod(factors)
+    cumulative_before = np.concatenate([[1.0], cumulative[:-1]])
+
+    longest = int(installment_months.max()) if len(installment_months) else 0
+    month = start_offset[:, None] + np.arange(longest)[None, :]
+    # Installments past the end of the forecast are dropped, like months_x
+    valid = (np.arange(longest)[None, :] < installment_months[:, None]) & (month < horizon)
+    month = np.minimum(month, horizon - 1)
+
+    payments = installment_payment[:, None] * cumulative[month] / \
+        cumulative_before[np.minimum(start_offset, horizon - 1)][:, None]
+    payments = np.where(valid, payments, 0.0)
+
+    return payments, monthly_total(payments, start_offset, valid.sum(axis=1), horizon)
+
+
+def monthly_total(payments, start_offset, loan_lengths, horizon):
+    """Scatter add zero padded per loan payments onto the month axis."""
+    columns = np.arange(payments.shape[1])
+    month = np.asarray(start_offset)[:, None] + columns[None, :]
+    valid = (columns[None, :] < np.asarray(loan_lengths)[:, None]) & (month < horizon)
+    return np.bincount(month[valid], weights=payments[valid], minlength=horizon)
+
+
+def real_loan_totals(installment_payment, start_offset, loan_lengths, predicted_inflation):
+    """Real payments of all loans summed per month, for many inflation paths.
+
+    Every payment in month m is installment * C[m] / C[s - 1], so the total
+    of month m is C[m] times the sum of installment / C[s - 1] over the loans
+    running in m: one (paths, loans) x (loans, months) product for all paths.
+
+    Args:
+        installment_payment: Nominal monthly installment of each loan, shape (loans,).
+        start_offset: Month index each loan starts at, shape (loans,).
+        loan_lengths: Installments of each loan inside the months, shape (loans,).
+        predicted_inflation: Monthly inflation in %, shape (paths, months).
+
+    Returns:
+        The totals, shape (paths, months).
+    """
+    installment_payment = np.asarray(installment_payment, dtype=float)
+    start_offset = np.asarray(start_offset, dtype=int)
+    loan_lengths = np.asarray(loan_lengths, dtype=int)
+
+    factors = inflation_factors(predicted_inflation)
+    horizon = factors.shape[1]
+    cumulative = np.cumprod(factors, axis=1)
+    cumulative_before = np.concatenate(
+        [np.ones((len(factors), 1)), cumulative[:, :-1]], axis=1)
+
+    months = np.arange(horizon)
+    running = (months[None, :] >= start_offset[:, None]) & \
+        (months[None, :] < (start_offset + loan_lengths)[:, None])
+    weights = installment_payment[None, :] / \
+        cumulative_before[:, np.minimum(start_offset, horizon - 1)]
+    return cumulative * (weights @ running)
@@ -0,0 +1,47 @@
+"""Helpers for the loans kept in State, keyed by a stable id."""
+
+import csv
+import io
+
+from pynecone import simulation
+
+# Form field ids of a loan, also the column order of a CSV import
+FIELDS = ["name", "sym", "loan", "interest", "installment"]
+
+
+def render(loanData):
+    # Create a new item string with new lines
+    return f"Name: {loanData['name']}<br>" \
+        f"Date: {loanData['sym']}<br>" \
+        f"Value: {loanData['loan']}<br>" \
+        f"Interest: {loanData['interest']}<br>" \
+        f"Installment: {loanData['installment']}<br>"
+
+
+def parse_csv(text):
+    """Parse pasted CSV rows of name, YYYY/MM, amount, interest %, months.
+
+    A header row and blank lines are skipped.
+
+    Returns:
+        The valid loans as form dicts, and one error message per bad row.
+    """
+    loans, errors = [], []
+
+    for line_number, row in enumerate(csv.reader(io.StringIO(text)), start=1):
+        row = [value.strip() for value in row]
+        if not any(row) or [value.lower() for value in row] == FIELDS:
+            continue
+        if len(row) != len(FIELDS):
+            errors.append(f"Line {line_number}: expected {len(FIELDS)} values, got {len(row)}")
+            continue
+
+        loanData = dict(zip(FIELDS, row))
+        try:
+            simulation.parse_loan(loanData)
+        except (ValueError, ZeroDivisionError) as e:
+            errors.append(f"Line {line_number}: {e}")
+            continue
+        loans.append(loanData)
+
+    return loans, errors
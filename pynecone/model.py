@@ -1,31 +1,86 @@
-import datetime
+import functools
+import glob
+import hashlib
+import os
+import time
+import warnings
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from functools import reduce
-
-import tensorflow as tf
-from tensorflow.keras.models import Model, Sequential, load_model
-from tensorflow.keras.layers import Dense, Dropout, InputLayer, concatenate, Input, LSTM
-from tensorflow.keras.regularizers import l2
-from tensorflow.keras.callbacks import EarlyStopping
-from tensorflow.keras.optimizers import Adam
-from tensorflow.keras.utils import plot_model
-
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import mean_squared_error, mean_absolute_error
-from sklearn.linear_model import LinearRegression
-from sklearn.model_selection import train_test_split
-from statsmodels.tsa.seasonal import seasonal_decompose
-
-
-def read_gov_data(URL_LINK):
-    df = pd.read_parquet(URL_LINK)
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from pynecone import (datasets, features, forecast_table, model_bundle, model_registry,
+                      numpy_model, telemetry)
+from pynecone.datasets import URL_ECON_INDICATOR, URL_CPI, URL_IPI, URL_PPI, URL_LABOUR
+
+
+def _date_filters(path, start, end):
+    # Compared in the file's own date type, so pyarrow can skip rows itself
+    date_type = pq.read_schema(path).field('date').type
+    if pa.types.is_string(date_type) or pa.types.is_large_string(date_type):
+        # ISO dates sort like the dates they spell
+        convert = lambda date: date.strftime('%Y-%m-%d')  # noqa: E731
+    elif pa.types.is_date(date_type):
+        convert = lambda date: date.date()  # noqa: E731
+    else:
+        convert = lambda date: date.to_pydatetime()  # noqa: E731
+
+    filters = []
+    if start is not None:
+        filters.append(('date', '>=', convert(start)))
+    if end is not None:
+        filters.append(('date', '<=', convert(end)))
+    return filters or None
+
+
+# DOSM publishes its indices and counts with one decimal
+PUBLISHED_DECIMALS = 1
+
+
+def downcast(df, decimals=PUBLISHED_DECIMALS):
+    # float32 only for columns on the published decimal grid that float32
+    # still tells apart, i.e. rounding restores every published value
+    unit = 10.0 ** -decimals
+    for column in df.columns:
+        if df[column].dtype != np.float64:
+            continue
+        values = df[column].to_numpy()
+        scaled = values / unit
+        compact = values.astype(np.float32)
+        on_grid = np.abs(scaled - np.round(scaled)) < 1e-6
+        kept = np.abs(compact - values) < unit / 2
+        if np.all((on_grid & kept) | np.isnan(values)):
+            df[column] = compact
+    return df
+
+
+def read_gov_data(URL_LINK, columns=None, start=None, end=None, compact=False):
+    """Read a DOSM dataset, indexed by date.
+
+    Args:
+        URL_LINK: The DOSM parquet URL, read from its local snapshot.
+        columns: Only read these columns, None for all of them.
+        start: Skip the months before this date.
+        end: Skip the months after this date.
+        compact: Downcast float columns to float32 where no published digit
+            is lost. Not for model inputs, those are computed in float64.
+
+    Returns:
+        The dataset.
+    """
+    # Reads the local snapshot, only hits DOSM when the cache is stale
+    path = datasets.dataset_path(URL_LINK)
+    with telemetry.span("data_load", source=os.path.basename(URL_LINK)):
+        df = pd.read_parquet(
+            path, engine='pyarrow',
+            columns=None if columns is None else ['date', *columns],
+            filters=_date_filters(path, start, end))
     if 'date' in df.columns:
-        df['date'] = pd.to_datetime(df['date'])
+        if not pd.api.types.is_datetime64_any_dtype(df['date']):
+            df['date'] = pd.to_datetime(df['date'], format='ISO8601')
         df.set_index('date', inplace=True)
 
-    return df
+    return downcast(df) if compact else df
 
 
 def find_date_range(datasets):
@@ -43,27 +98,45 @@ def find_date_range(datasets):
     return max_start_date, min_end_date
 
 
-URL_ECON_INDICATOR = 'https://storage.dosm.gov.my/econindicators/economic_indicators.parquet'
-URL_CPI = 'https://storage.dosm.gov.my/cpi/cpi_headline.parquet'
-URL_IPI = 'https://storage.dosm.gov.my/ipi/ipi.parquet'
-URL_PPI = 'https://storage.dosm.gov.my/ppi/ppi.parquet'
-URL_LABOUR = 'https://storage.dosm.gov.my/labour/labourforce_monthly.parquet'
-
-econ_indicator_df = read_gov_data(URL_ECON_INDICATOR)
-cpi_df = read_gov_data(URL_CPI)
-ipi_df = read_gov_data(URL_IPI)
-ppi_df = read_gov_data(URL_PPI)
-lfs_df = read_gov_data(URL_LABOUR)
-
-start_date, end_date = find_date_range(
-    [econ_indicator_df, cpi_df, ppi_df, ipi_df])
+# The columns build_features uses from each dataset. The model sees these
+# through their trends and targets, so they stay float64
+USED_COLUMNS = {
+    URL_CPI: ["overall"],
+    URL_IPI: ["overall"],
+    URL_PPI: ["overall"],
+    URL_LABOUR: ["unemployed", "employed"],
+}
+# Sub-indices that are only carried along in the frame, float32 where no
+# published digit is lost
+COMPACT_COLUMNS = {
+    URL_IPI: ["mfg", "electric"],
+    URL_PPI: ["agriculture", "mining", "manufacturing", "electricity", "water"],
+}
+
+
+def _read_used(url):
+    df = read_gov_data(url, USED_COLUMNS[url], start_date, end_date)
+    if url in COMPACT_COLUMNS:
+        df = df.join(read_gov_data(url, COMPACT_COLUMNS[url], start_date, end_date,
+                                   compact=True))
+    return df
 
 
 def get_col_from(df, column):
     return df[column][(df.index >= start_date) & (df.index <= end_date)]
 
 
-def read_data():
+# Raw column -> its trend column, the trends are the model inputs
+TREND_COLUMNS = {
+    "cpi_overall": "cpi_trend",
+    "ipi_overall": "ipi_trend",
+    "ppi_overall": "ppi_trend",
+    "labour_unemployed": "labour_unemployed_trend",
+    "labour_employed": "labour_employed_trend",
+}
+
+
+def build_features(previous=None):
     data = pd.DataFrame()
     data["cpi_overall"] = get_col_from(cpi_df, "overall")
 
@@ -81,39 +154,132 @@ def read_data():
     data["labour_unemployed"] = get_col_from(lfs_df, "unemployed")
     data["labour_employed"] = get_col_from(lfs_df, "employed")
 
-    data["cpi_trend"] = seasonal_decompose(
-        data["cpi_overall"], model='additive', period=12).trend
-    data['cpi_trend'].fillna(method='ffill', inplace=True)
-    data['cpi_trend'].fillna(method='bfill', inplace=True)
-
-    data["ipi_trend"] = seasonal_decompose(
-        data["ipi_overall"], model='additive', period=12).trend
-    data['ipi_trend'].fillna(method='ffill', inplace=True)
-    data['ipi_trend'].fillna(method='bfill', inplace=True)
-
-    data["ppi_trend"] = seasonal_decompose(
-        data["ppi_overall"], model='additive', period=12).trend
-    data['ppi_trend'].fillna(method='ffill', inplace=True)
-    data['ppi_trend'].fillna(method='bfill', inplace=True)
-
-    data["labour_unemployed_trend"] = seasonal_decompose(
-        data["labour_unemployed"], model='additive', period=12).trend
-    data['labour_unemployed_trend'].fillna(method='ffill', inplace=True)
-    data['labour_unemployed_trend'].fillna(method='bfill', inplace=True)
-
-    data["labour_employed_trend"] = seasonal_decompose(
-        data["labour_employed"], model='additive', period=12).trend
-    data['labour_employed_trend'].fillna(method='ffill', inplace=True)
-    data['labour_employed_trend'].fillna(method='bfill', inplace=True)
+    # Same values as seasonal_decompose(period=12).trend with ffill / bfill
+    raw = data[list(TREND_COLUMNS)].to_numpy(dtype=float)
+    known = _known_months(previous, data)
+    if known:
+        old_raw = previous[list(TREND_COLUMNS)].to_numpy(dtype=float)
+        old_trend = previous[list(TREND_COLUMNS.values())].to_numpy(dtype=float)
+        _, trend = features.extend_trend(old_raw, old_trend, raw[known:])
+    else:
+        trend = features.centered_trend(raw)
+
+    for i, column in enumerate(TREND_COLUMNS.values()):
+        data[column] = trend[:, i]
     return data
 
 
-data = read_data()
+def _known_months(previous, data):
+    # A previous frame only helps when the new data just appends months to it
+    if previous is None or len(previous) > len(data) or len(previous) == 0:
+        return 0
+    if not previous.index.equals(data.index[:len(previous)]):
+        return 0
+    columns = list(TREND_COLUMNS)
+    if not previous[columns].equals(data[columns].iloc[:len(previous)]):
+        return 0
+    return len(previous)
+
+
+# Bump when build_features changes, so old persisted frames are not reused
+FEATURES_VERSION = 5
+
+
+def features_version():
+    # The engineered frame only changes when DOSM publishes new data
+    sha = hashlib.sha256(str(FEATURES_VERSION).encode())
+    for url in [URL_ECON_INDICATOR, URL_CPI, URL_IPI, URL_PPI, URL_LABOUR]:
+        sha.update(datasets.content_hash(url).encode())
+    return sha.hexdigest()[:16]
+
+
+def _manifest_mtime():
+    path = os.path.join(datasets.CACHE_DIR, datasets.MANIFEST_NAME)
+    return os.path.getmtime(path) if os.path.exists(path) else None
+
+
+def load_sources():
+    """Fetch whatever is stale, then read the DOSM data build_features uses.
+
+    Runs at import, and again from check_sources once ECONOME_DATA_TTL has
+    passed or the snapshots were refreshed with python -m pynecone.datasets.
+    The data is only read again when a snapshot actually changed.
+    """
+    global econ_indicator_df, start_date, end_date, cpi_df, ipi_df, ppi_df, lfs_df
+    global features_key, _sources_checked
+
+    # Download whatever is stale concurrently, the reads below then hit local files
+    datasets.fetch_all()
+    _sources_checked = (time.monotonic(), _manifest_mtime())
+    key = features_version()
+    if key == features_key:
+        return
+
+    # The date range comes from the dates alone, the values are only read inside it
+    econ_indicator_df = read_gov_data(URL_ECON_INDICATOR, columns=[])
+    start_date, end_date = find_date_range(
+        [econ_indicator_df] +
+        [read_gov_data(url, columns=[]) for url in [URL_CPI, URL_PPI, URL_IPI]])
+    cpi_df, ipi_df, ppi_df, lfs_df = [
+        _read_used(url) for url in [URL_CPI, URL_IPI, URL_PPI, URL_LABOUR]]
+    features_key = key
+
+
+def check_sources():
+    # On every read, only a clock and a stat of the manifest until a refresh is due
+    checked_at, manifest_mtime = _sources_checked
+    if time.monotonic() - checked_at >= datasets.CACHE_TTL or \
+            _manifest_mtime() != manifest_mtime:
+        load_sources()
+
+
+features_key = None
+_sources_checked = None
+load_sources()
+_features = {}
+
+
+def _features_path(key):
+    # Named by FEATURES_VERSION too, frames of another build_features are never reused
+    return os.path.join(datasets.CACHE_DIR, f"features-v{FEATURES_VERSION}-{key}.parquet")
+
+
+def _previous_features():
+    # The newest frame built from older data, its trends can be extended
+    paths = glob.glob(_features_path("*"))
+    if not paths:
+        return None
+    try:
+        previous = pd.read_parquet(max(paths, key=os.path.getmtime))
+    except (OSError, ValueError):
+        return None
+    columns = list(TREND_COLUMNS) + list(TREND_COLUMNS.values())
+    return previous if set(columns) <= set(previous.columns) else None
+
+
+def read_data():
+    check_sources()
+    if features_key in _features:
+        return _features[features_key]
+
+    path = _features_path(features_key)
+    if os.path.exists(path):
+        with telemetry.span("data_load", source="features"):
+            data = pd.read_parquet(path)
+    else:
+        with telemetry.span("decomposition"):
+            data = build_features(_previous_features())
+        os.makedirs(datasets.CACHE_DIR, exist_ok=True)
+        # The workers start together and may all build it, each writes its own file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        data.to_parquet(tmp_path)
+        os.replace(tmp_path, path)
+
+    # Frames of older data are not needed anymore
+    _features.clear()
+    _features[features_key] = data
+    return data
 
-train_ratio = 0.6
-val_ratio = 0.2
-test_ratio = 0.2
-# @title Loading data for model
 
 # input_columns =  [
 #     'cpi_overall',
@@ -133,106 +299,194 @@ target_column = ['cpi_overall']
 target_forecast_months = [3, 6, 9, 12]
 max_forecast_months = max(target_forecast_months)
 
-X, y = [], []
-for i in range(len(data) - max_forecast_months):
-    X.append(data[input_columns].iloc[i])
-    y.append([data[target_column].iloc[i+j][0]
-             for j in target_forecast_months])
-X = np.array(X)
-y = np.array(y)
 
-train_size = int(len(X) * train_ratio)
-val_size = int(len(X) * val_ratio)
-test_size = int(len(X) * test_ratio)
+@functools.lru_cache(maxsize=None)
+def _refit_scalers():
+    # sklearn is only imported the first time we actually need to scale
+    from pynecone import training
+
+    warnings.warn(
+        f"No model bundle at {model_bundle.bundle_path(model_registry.MODEL_PATH)}, "
+        "refitting the scalers on the downloaded data. Forecasts drift from the "
+        "trained model as DOSM revises its data, save the bundle with "
+        "python -m pynecone.model_bundle", RuntimeWarning)
+    return training.fit_scalers()
+
 
-val_size_cum = train_size + val_size
-test_size_cum = len(X)
+def get_scalers():
+    # The scalers saved with the model, a missing or mismatched bundle raises instead of serving
+    bundle = model_bundle.get(model_registry.MODEL_PATH)
+    if bundle is None:
+        if not model_bundle.ALLOW_REFIT:
+            raise model_bundle.MissingBundle(
+                f"No model bundle at {model_bundle.bundle_path(model_registry.MODEL_PATH)}, "
+                "save it with python -m pynecone.model_bundle or allow refitting "
+                "with ECONOME_ALLOW_REFIT=1")
+        return _refit_scalers()
+    bundle.check(input_columns, target_column, target_forecast_months)
+    return bundle.scaler_x, bundle.scaler_y
 
-print("Train : " + str(train_size))
-print("Val : " + str(val_size) + ", cumulative : " + str(val_size_cum))
-print("Test : " + str(test_size) + ", cumulative : " + str(test_size_cum))
 
-X_train_total, y_train_total = X[: val_size_cum], y[: val_size_cum]
-X_train, X_val, y_train, y_val = train_test_split(
-    X_train_total, y_train_total, test_size=val_ratio, random_state=42)
-X_test, y_test = X[val_size_cum:], y[val_size_cum:]
+selected_forecast_levels = [3]
+
 
-scaler_x = StandardScaler()
-X_train_total_scaled = scaler_x.fit_transform(X_train_total)
-X_train_scaled = scaler_x.fit_transform(X_train)
-X_val_scaled = scaler_x.transform(X_val)
-X_test_scaled = scaler_x.transform(X_test)
+def predict_forecasts(input_dates):
+    # One stacked predict call for every start date
+    data = read_data()
+    # The exported NumPy forward pass when there is one, Keras otherwise
+    model = numpy_model.get(model_registry.MODEL_PATH)
+    if model is None:
+        model = model_registry.get_model(model_registry.MODEL_PATH)
 
-scaler_y = StandardScaler()
+    scaler_x, scaler_y = get_scalers()
 
-y_train_total_scaled = scaler_y.fit_transform(y_train_total)
-y_train_scaled = scaler_y.fit_transform(y_train)
-y_val_scaled = scaler_y.transform(y_val)
-y_test_scaled = scaler_y.transform(y_test)
+    rows = data.loc[input_dates]
+    inputs_scaled = scaler_x.transform(rows[input_columns].to_numpy())
 
-input_shape = (X_train_scaled.shape[1], )
-output_shape = len(target_forecast_months)
+    with telemetry.span("predict", rows=len(inputs_scaled), engine=type(model).__name__):
+        if isinstance(model, numpy_model.NumpyModel):
+            forecast_scaled = model.predict(inputs_scaled)
+        else:
+            forecast_scaled = model.predict(inputs_scaled, verbose=0)
+    forecast = scaler_y.inverse_transform(forecast_scaled)
 
-print("Train X shape : " + str(X_train_scaled.shape))
-print("Train Y shape : " + str(y_train_scaled.shape))
-print("Val X shape : " + str(X_val_scaled.shape))
-print("Val Y shape : " + str(y_val_scaled.shape))
-print("Test X shape : " + str(X_test_scaled.shape))
-print("Test Y shape : " + str(y_test_scaled.shape))
+    initial_cpi = rows[target_column[0]].to_numpy()
+    return initial_cpi, forecast
 
-model = load_model("./pynecone/model/my_model_3_6_9_12.h5")
 
-selected_forecast_levels = [3]
+def inflation_paths(initial_cpi, forecast, num_of_months):
+    """Turn model forecasts into monthly inflation paths.
+
+    The CPI is interpolated linearly between the selected forecast levels,
+    then extended past the last level by the average monthly increase up to
+    the highest forecast. Inflation is the month on month CPI change in %.
+
+    Args:
+        initial_cpi: The CPI at each start date, shape (scenarios,).
+        forecast: The model forecasts, shape (scenarios, horizons).
+        num_of_months: How many months of inflation to return.
+
+    Returns:
+        The inflation paths, shape (scenarios, num_of_months).
+    """
+    initial_cpi = np.asarray(initial_cpi, dtype=float)
+    forecast = np.asarray(forecast, dtype=float)
+
+    levels = np.asarray(selected_forecast_levels)
+    knots_x = np.concatenate([[0], levels])
+    knots_y = np.column_stack(
+        [initial_cpi, forecast[:, :len(selected_forecast_levels)]])
+    interpolated_months = int(levels[-1])
+
+    months = np.arange(max(num_of_months, interpolated_months))
+    segment = np.minimum(np.searchsorted(levels, months, side="right"),
+                         len(levels) - 1)
+    monthly_increment = (knots_y[:, segment + 1] - knots_y[:, segment]) / \
+        (knots_x[segment + 1] - knots_x[segment])
+    cpi_over_time = knots_y[:, segment] + \
+        monthly_increment * (months - knots_x[segment])
+
+    # Past the last level, keep climbing towards the highest forecast
+    tail_increment = (forecast.max(axis=1) - initial_cpi) / interpolated_months
+    tail = months >= interpolated_months
+    cpi_over_time[:, tail] = cpi_over_time[:, [interpolated_months - 1]] + \
+        tail_increment[:, None] * (months[tail] - interpolated_months + 1)
+    cpi_over_time = cpi_over_time[:, :num_of_months]
+
+    previous_cpi = np.column_stack([initial_cpi, cpi_over_time[:, :-1]])
+    return ((cpi_over_time - previous_cpi) / previous_cpi) * 100
+
+
+def forecast_future_CPI_batch(scenarios):
+    """Forecast inflation for many (start_year, start_month, num_of_months).
+
+    Args:
+        scenarios: A list of (start_year, start_month, num_of_months) tuples.
+
+    Returns:
+        A list with the monthly inflation path of each scenario.
+    """
+    input_dates = pd.DatetimeIndex(
+        [pd.Timestamp(year=start_year, month=start_month, day=1)
+         for start_year, start_month, _ in scenarios])
+    horizons = [num_of_months for _, _, num_of_months in scenarios]
+
+    initial_cpi, forecast = lookup_forecasts(input_dates)
+    inflation = inflation_paths(initial_cpi, forecast, max(horizons))
+
+    return [inflation[i, :num_of_months].tolist()
+            for i, num_of_months in enumerate(horizons)]
+
+
+def lookup_forecasts(input_dates):
+    # Served from the precomputed table when possible, no model call at all
+    check_sources()
+    with telemetry.span("forecast_lookup", rows=len(input_dates)) as fields:
+        precomputed = forecast_table.lookup(input_dates, features_key)
+        fields["hit"] = precomputed is not None
+    if precomputed is not None:
+        return precomputed
+    return predict_forecasts(input_dates)
+
+
+def forecast_version():
+    # Everything a forecast depends on: the data, the model file and its bundle
+    check_sources()
+    return forecast_table.table_version(features_key)
 
 
 def forecast_future_CPI(start_year: int, start_month: int, num_of_months: int):
-    start_month = str(start_year) + "-" + str(start_month).rjust(2, "0")
-    date_range = pd.date_range(start_month, freq='MS', periods=num_of_months)
-    # date_range = create_date_range(start_year, start_month, num_of_months)
+    return forecast_future_CPI_batch([(start_year, start_month, num_of_months)])[0]
 
-    data = read_data()
-    model = load_model("./pynecone/model/my_model_3_6_9_12.h5")
 
-    input_date = date_range[0]
-    inputs = data.loc[input_date][input_columns]
-    inputs_scaled = scaler_x.transform([inputs.array, ])
+SCENARIO_SAMPLES = 2000
+# Fixed, so the same submission always gets the same bands
+SCENARIO_SEED = 0
 
-    forecast_scaled = model.predict(inputs_scaled, verbose=0)
-    forecast = scaler_y.inverse_transform(forecast_scaled)[0]
+_residuals = {}
 
-    cpi_over_time = []
-    initial_val = data.loc[input_date][target_column].array[0]
-    previous_start_val = initial_val
-    previous_months_count = 0
 
-    for i in range(0, len(selected_forecast_levels)):
-        months_count = selected_forecast_levels[i] - previous_months_count
-        forecast_val = forecast[i]
+def backtest_residuals():
+    """Actual CPI minus the model's forecast, over the test windows.
 
-        monthly_increment = (forecast_val - previous_start_val) / months_count
+    Only the test split is used, training shuffled the train and val windows
+    together so both were fitted on.
 
-        for j in range(months_count):
-            cpi_over_time.append(previous_start_val + (monthly_increment * j))
+    Returns:
+        The errors at every horizon, shape (months, horizons).
+    """
+    version = forecast_version()
+    if version not in _residuals:
+        data = read_data()
+        samples = len(data) - max_forecast_months
+        first = features.test_start(samples)
+        dates = data.index[first:samples]
 
-        previous_start_val = forecast_val
-        previous_months_count = selected_forecast_levels[i]
+        with telemetry.span("backtest", rows=len(dates)):
+            _, forecast = predict_forecasts(dates)
+        cpi = data[target_column[0]].to_numpy(dtype=float)
+        rows = np.arange(first, samples)[:, None] + \
+            np.asarray(target_forecast_months)[None, :]
+        _residuals[version] = cpi[rows] - forecast
+    return _residuals[version]
 
-    if len(cpi_over_time) > num_of_months:
-        cpi_over_time = cpi_over_time[:num_of_months]
-    else:
-        monthly_increment = (max(forecast) - initial_val) / len(cpi_over_time)
-        for i in range(len(cpi_over_time), num_of_months):
-            cpi_over_time.append(cpi_over_time[-1] + monthly_increment)
 
-    previous_cpi = initial_val
-    inflation_over_time = []
-    for cpi in cpi_over_time:
-        old_cpi = previous_cpi
-        new_cpi = cpi
+def forecast_scenarios(start_year, start_month, num_of_months,
+                       samples=SCENARIO_SAMPLES, seed=SCENARIO_SEED):
+    """Monthly inflation paths around the forecast, for risk bands.
 
-        inflation = ((new_cpi - old_cpi) / old_cpi) * 100
-        inflation_over_time.append(inflation)
+    Every path adds the errors of one random backtest month to the forecast,
+    all horizons of that month together so their correlation is kept, and
+    goes through inflation_paths with the others in one pass.
 
-        previous_cpi = new_cpi
+    Returns:
+        The inflation paths in %, shape (samples, num_of_months).
+    """
+    date = pd.DatetimeIndex([pd.Timestamp(year=start_year, month=start_month, day=1)])
+    initial_cpi, forecast = lookup_forecasts(date)
+    residuals = backtest_residuals()
 
-    return inflation_over_time
+    rng = np.random.default_rng(seed)
+    forecasts = np.asarray(forecast, dtype=float)[0] + \
+        residuals[rng.integers(len(residuals), size=samples)]
+    return inflation_paths(np.repeat(initial_cpi, samples), forecasts, num_of_months)
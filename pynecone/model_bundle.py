@@ -0,0 +1,131 @@
+"""The scalers, columns and horizons the CPI model was trained with.
+
+Saved next to the .h5 as one versioned .npz, so the server scales inputs
+exactly like training did instead of refitting on whatever data it just
+downloaded. Write it right after training, from the same data:
+
+    python -m pynecone.model_bundle
+"""
+
+import os
+
+import numpy as np
+
+from pynecone import datasets, model_registry
+
+# Bump when the layout of the bundle changes
+BUNDLE_VERSION = 1
+
+# No bundle is committed yet, so without one the scalers are refitted on the
+# downloaded data with a warning. Set to 0 to refuse to forecast instead
+ALLOW_REFIT = os.environ.get("ECONOME_ALLOW_REFIT", "1") == "1"
+
+_bundles = {}
+
+
+class BundleMismatch(ValueError):
+    """The bundle was not saved for this model or this code."""
+
+
+class MissingBundle(FileNotFoundError):
+    """No bundle was saved for the model."""
+
+
+class Scaler:
+    """The transform of a fitted StandardScaler, without sklearn."""
+
+    def __init__(self, mean, scale):
+        self.mean_ = np.asarray(mean, dtype=float)
+        self.scale_ = np.asarray(scale, dtype=float)
+
+    def transform(self, values):
+        return (np.asarray(values, dtype=float) - self.mean_) / self.scale_
+
+    def inverse_transform(self, values):
+        return np.asarray(values, dtype=float) * self.scale_ + self.mean_
+
+
+class Bundle:
+    def __init__(self, scaler_x, scaler_y, input_columns, target_column, horizons):
+        self.scaler_x = scaler_x
+        self.scaler_y = scaler_y
+        self.input_columns = input_columns
+        self.target_column = target_column
+        self.horizons = horizons
+
+    def check(self, input_columns, target_column, horizons):
+        """Raise BundleMismatch unless the bundle fits the serving code."""
+        expected = (list(input_columns), list(target_column), list(horizons))
+        saved = (self.input_columns, self.target_column, self.horizons)
+        if saved != expected:
+            raise BundleMismatch(
+                f"Model bundle was saved for {saved}, the server uses {expected}")
+        if len(self.scaler_x.mean_) != len(input_columns) or \
+                len(self.scaler_y.mean_) != len(horizons):
+            raise BundleMismatch("Model bundle scalers do not match its columns")
+
+
+def bundle_path(model_path):
+    return os.path.splitext(model_path)[0] + ".bundle.npz"
+
+
+def save(scaler_x, scaler_y, input_columns, target_column, horizons,
+         model_path=model_registry.MODEL_PATH):
+    """Save fitted scalers and the model's columns next to model_path."""
+    path = bundle_path(model_path)
+    np.savez(
+        path,
+        bundle_version=np.array(BUNDLE_VERSION),
+        model_sha256=np.array(datasets.file_hash(model_path)),
+        x_mean=scaler_x.mean_, x_scale=scaler_x.scale_,
+        y_mean=scaler_y.mean_, y_scale=scaler_y.scale_,
+        input_columns=np.array(input_columns),
+        target_column=np.array(target_column),
+        horizons=np.array(horizons),
+    )
+    return path
+
+
+def get(model_path=model_registry.MODEL_PATH):
+    """The bundle of model_path, None when none was saved.
+
+    Raises:
+        BundleMismatch: The bundle belongs to another model file or version.
+    """
+    path = bundle_path(model_path)
+    if not os.path.exists(path):
+        return None
+
+    key = (os.path.abspath(path), os.path.getmtime(path), os.path.getmtime(model_path))
+    if key not in _bundles:
+        with np.load(path) as npz:
+            if int(npz["bundle_version"]) != BUNDLE_VERSION:
+                raise BundleMismatch(
+                    f"{path} has bundle version {int(npz['bundle_version'])}, "
+                    f"expected {BUNDLE_VERSION}")
+            # Scalers of another training run would silently skew every forecast
+            if str(npz["model_sha256"]) != datasets.file_hash(model_path):
+                raise BundleMismatch(f"{path} was not saved for {model_path}")
+
+            _bundles[key] = Bundle(
+                Scaler(npz["x_mean"], npz["x_scale"]),
+                Scaler(npz["y_mean"], npz["y_scale"]),
+                [str(column) for column in npz["input_columns"]],
+                [str(column) for column in npz["target_column"]],
+                [int(horizon) for horizon in npz["horizons"]],
+            )
+    return _bundles[key]
+
+
+def file_hash(model_path=model_registry.MODEL_PATH):
+    # Part of the forecast table version, new scalers mean new forecasts
+    path = bundle_path(model_path)
+    return datasets.cached_file_hash(path) if os.path.exists(path) else "none"
+
+
+if __name__ == "__main__":
+    from pynecone import model, training
+
+    scaler_x, scaler_y = training.fit_scalers()
+    print(save(scaler_x, scaler_y, model.input_columns, model.target_column,
+               model.target_forecast_months))
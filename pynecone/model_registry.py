@@ -0,0 +1,79 @@
+"""Process wide registry of loaded Keras models."""
+
+import os
+import threading
+import time
+
+from pynecone import telemetry
+
+MODEL_PATH = "./pynecone/model/my_model_3_6_9_12.h5"
+
+_lock = threading.Lock()
+_models = {}
+
+# Exposed for the metrics / debugging, keyed by model path
+metrics = {}
+
+
+def _metrics_for(path):
+    return metrics.setdefault(path, {
+        "loads": 0,
+        "reloads": 0,
+        "cache_hits": 0,
+        "last_load_seconds": 0.0,
+        "total_load_seconds": 0.0,
+    })
+
+
+def _load(path):
+    from tensorflow.keras.models import load_model
+
+    started = time.perf_counter()
+    with telemetry.span("model_load", path=path):
+        model = load_model(path)
+    elapsed = time.perf_counter() - started
+
+    stats = _metrics_for(path)
+    stats["loads"] += 1
+    stats["last_load_seconds"] = elapsed
+    stats["total_load_seconds"] += elapsed
+    return model
+
+
+def get_model(path=MODEL_PATH):
+    """Return the model stored at path, loading it only once per process.
+
+    The file's modification time is checked on every call, so replacing the
+    .h5 on disk swaps in the new model on the next request.
+
+    Args:
+        path: The path to the .h5 model file.
+
+    Returns:
+        The loaded Keras model.
+    """
+    key = os.path.abspath(path)
+    mtime = os.path.getmtime(path)
+
+    entry = _models.get(key)
+    if entry is not None and entry[0] == mtime:
+        _metrics_for(path)["cache_hits"] += 1
+        return entry[1]
+
+    # Only one handler loads, the others wait and then get the cached model
+    with _lock:
+        entry = _models.get(key)
+        if entry is not None and entry[0] == mtime:
+            _metrics_for(path)["cache_hits"] += 1
+            return entry[1]
+
+        if entry is not None:
+            _metrics_for(path)["reloads"] += 1
+        model = _load(path)
+        _models[key] = (mtime, model)
+        return model
+
+
+def clear():
+    with _lock:
+        _models.clear()
@@ -0,0 +1,123 @@
+"""Pure NumPy forward pass of the dense CPI model.
+
+The shipped model is a few Dense layers over five scaled features, calling
+it through TensorFlow costs far more than the arithmetic. `export` dumps the
+weights of the .h5 next to it as .npz (with h5py, no TensorFlow needed) and
+the server runs the forward pass below instead of model.predict:
+
+    python -m pynecone.numpy_model
+"""
+
+import json
+import os
+
+import numpy as np
+
+from pynecone import datasets, model_registry
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0),
+    "tanh": np.tanh,
+    "sigmoid": lambda x: 1 / (1 + np.exp(-x)),
+    "elu": lambda x: np.where(x > 0, x, np.expm1(x)),
+}
+
+# Layers that do nothing at inference time
+SKIPPED_LAYERS = {"InputLayer", "Dropout"}
+
+_models = {}
+
+
+class NumpyModel:
+    """Dense layers as (kernel, bias, activation), applied in order."""
+
+    def __init__(self, layers):
+        self.layers = layers
+
+    def predict(self, inputs):
+        outputs = np.asarray(inputs, dtype=np.float32)
+        for kernel, bias, activation in self.layers:
+            outputs = ACTIVATIONS[activation](outputs @ kernel + bias)
+        return outputs
+
+
+def export_path(model_path):
+    return os.path.splitext(model_path)[0] + ".npz"
+
+
+def export(model_path=model_registry.MODEL_PATH):
+    """Write the weights of a Keras .h5 model of Dense layers to .npz."""
+    import h5py
+
+    arrays = {}
+    activations = []
+    with h5py.File(model_path, "r") as f:
+        config = json.loads(f.attrs["model_config"])
+        for layer in config["config"]["layers"]:
+            if layer["class_name"] in SKIPPED_LAYERS:
+                continue
+            if layer["class_name"] != "Dense":
+                raise ValueError(f"Cannot export {layer['class_name']} layers")
+            if layer["config"]["activation"] not in ACTIVATIONS:
+                raise ValueError(f"Unsupported activation {layer['config']['activation']}")
+
+            name = layer["config"]["name"]
+            weights = f["model_weights"][name][name]
+            arrays[f"kernel_{len(activations)}"] = weights["kernel:0"][()]
+            arrays[f"bias_{len(activations)}"] = weights["bias:0"][()]
+            activations.append(layer["config"]["activation"])
+
+    path = export_path(model_path)
+    np.savez(path, activations=np.array(activations),
+             source_sha256=np.array(datasets.file_hash(model_path)), **arrays)
+    return path
+
+
+def get(model_path=model_registry.MODEL_PATH):
+    """The NumPy model exported from model_path, None if missing or stale."""
+    path = export_path(model_path)
+    if not os.path.exists(path):
+        return None
+
+    key = (os.path.abspath(path), os.path.getmtime(path), os.path.getmtime(model_path))
+    if key not in _models:
+        with np.load(path) as npz:
+            # An export of an older .h5 must not serve the new one
+            if str(npz["source_sha256"]) != datasets.file_hash(model_path):
+                _models[key] = None
+            else:
+                _models[key] = NumpyModel([
+                    (npz[f"kernel_{i}"].astype(np.float32),
+                     npz[f"bias_{i}"].astype(np.float32),
+                     str(activation))
+                    for i, activation in enumerate(npz["activations"])
+                ])
+    return _models[key]
+
+
+def compare_with_keras(model_path=model_registry.MODEL_PATH, samples=1000, seed=0):
+    """Largest difference to Keras and the latency of both on single rows."""
+    import time
+
+    keras_model = model_registry.get_model(model_path)
+    numpy_model = get(model_path)
+
+    rng = np.random.default_rng(seed)
+    inputs = rng.normal(size=(samples, numpy_model.layers[0][0].shape[0])).astype(np.float32)
+    max_difference = float(np.abs(
+        keras_model.predict(inputs, verbose=0) - numpy_model.predict(inputs)).max())
+
+    timings = {}
+    for name, predict in [("keras", lambda row: keras_model.predict(row, verbose=0)),
+                          ("numpy", numpy_model.predict)]:
+        started = time.perf_counter()
+        for i in range(100):
+            predict(inputs[i:i + 1])
+        timings[name] = (time.perf_counter() - started) / 100 * 1000
+
+    return max_difference, timings
+
+
+if __name__ == "__main__":
+    print(export())
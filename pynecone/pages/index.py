@@ -13,6 +13,7 @@ def index() -> rx.Component:
 
         return rx.container(
 
+                rx.text(State.figure_loading, color="gray"),
                 rx.text("Real Monthly Income vs Real Monthly Expenses",
                         font_weight="bold",
                         font_size="1em",
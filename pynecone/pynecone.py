@@ -1,6 +1,6 @@
 """Welcome to Reflex!."""
 
-from pynecone import styles
+from pynecone import styles, telemetry, worker_pool
 
 # Import all the pages.
 from pynecone.pages import *
@@ -9,4 +9,14 @@ import reflex as rx
 
 # Create the app and compile it.
 app = rx.App(style=styles.base_style)
+
+# Prometheus text endpoint for the submit pipeline timings
+if telemetry.METRICS_ENDPOINT:
+    app.api.add_api_route("/metrics", telemetry.metrics_endpoint)
+    app.add_middleware(telemetry.serialization_middleware())
+
+# Warm the workers up at start, /ready answers 503 until they are
+app.api.add_event_handler("startup", worker_pool.start_warm_up)
+app.api.add_api_route("/ready", worker_pool.readiness_endpoint)
+
 app.compile()
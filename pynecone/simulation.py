@@ -0,0 +1,379 @@
+"""Loan and real income simulation, independent of Reflex and plotly.
+
+Everything here works on plain numbers and NumPy arrays, so it can be
+benchmarked, run in a worker process or called from a script.
+"""
+
+import collections
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
+
+from pynecone import loan_engine, telemetry
+
+# NOTICE: model's maximum / highest start date: 2023, 1 (Constraints of LSTM model)
+MODEL_LAST_START_YEAR = 2023
+MODEL_LAST_START_MONTH = 1
+
+# Yearly pay raise applied every January
+JANUARY_RAISE = 1.03
+
+# The inflation scenario percentiles drawn as risk bands
+BAND_PERCENTILES = (5, 50, 95)
+
+
+@dataclass
+class Loan:
+    __slots__ = ("name", "start_year", "start_month",
+                 "installment_months", "installment_payment")
+
+    name: str
+    start_year: int
+    start_month: int
+    installment_months: int
+    installment_payment: float
+
+    @property
+    def end_year(self) -> int:
+        return self.start_year + (self.start_month + self.installment_months - 1) // 12
+
+    @property
+    def end_month(self) -> int:
+        return (self.start_month + self.installment_months - 1) % 12 + 1
+
+
+@dataclass
+class Simulation:
+    __slots__ = ("loans", "start_year", "start_month", "end_year", "end_month",
+                 "months", "predicted_inflation", "start_offset", "loan_lengths",
+                 "real_payments", "real_loan_total", "real_income", "real_expenses",
+                 "bands")
+
+    loans: list
+    start_year: int
+    start_month: int
+    end_year: int
+    end_month: int
+    # "year/month" label of every simulated month
+    months: list
+    # Monthly inflation in %, shape (months,)
+    predicted_inflation: np.ndarray
+    # Month index each loan starts at, shape (loans,)
+    start_offset: np.ndarray
+    # Installments of each loan inside the simulated months, shape (loans,)
+    loan_lengths: np.ndarray
+    # Real payments of each loan, zero padded, shape (loans, longest loan)
+    real_payments: np.ndarray
+    # All loans summed per month, shape (months,)
+    real_loan_total: np.ndarray
+    real_income: np.ndarray
+    real_expenses: np.ndarray
+    # ScenarioBands over the inflation scenarios, None when not computed
+    bands: object
+
+    @property
+    def initial_disposal(self) -> float:
+        return float(self.real_income[0] - self.real_expenses[0])
+
+    @property
+    def final_disposal(self) -> float:
+        return float(self.real_income[-1] - self.real_expenses[-1])
+
+    def loan_payments(self, i) -> np.ndarray:
+        return self.real_payments[i, :self.loan_lengths[i]]
+
+    def loan_months(self, i) -> list:
+        offset = self.start_offset[i]
+        return self.months[offset: offset + self.loan_lengths[i]]
+
+
+@dataclass
+class ScenarioBands:
+    __slots__ = ("percentiles", "samples", "real_income", "real_expenses", "disposal")
+
+    percentiles: tuple
+    # Number of inflation paths the percentiles are taken over
+    samples: int
+    # One row per percentile, shape (percentiles, months)
+    real_income: np.ndarray
+    real_expenses: np.ndarray
+    disposal: np.ndarray
+
+
+def diff_month(d1, d2):
+    # d1 should be HIGHER or EQUAL to d2
+    return (abs(d1.year - d2.year) * 12 + d1.month - d2.month)
+
+
+def parse_loan(loanData) -> Loan:
+    """Turn the loan form data ("sym" is "YYYY/MM") into a Loan."""
+    start_year, start_month = loanData["sym"].split("/")
+
+    loan_amt = int(loanData["loan"])
+    loan_interest = 1.0 + (int(loanData["interest"]) / 100)
+    installment_months = int(loanData["installment"])
+
+    return Loan(
+        name=loanData["name"],
+        start_year=int(start_year),
+        start_month=int(start_month),
+        installment_months=installment_months,
+        installment_payment=(loan_amt * loan_interest) / installment_months,
+    )
+
+
+def loans_span(loans):
+    """The earliest start and the latest end (year, month) over all loans."""
+    lowest_start_year = min([x.start_year for x in loans])
+    lowest_start_month = min(
+        [x.start_month for x in loans if x.start_year == lowest_start_year])
+
+    highest_end_year = max([x.end_year for x in loans])
+    highest_end_month = max(
+        [x.end_month for x in loans if x.end_year == highest_end_year])
+
+    return lowest_start_year, lowest_start_month, highest_end_year, highest_end_month
+
+
+def forecast_window(start_year, start_month):
+    """The model start date to forecast from, and how many months to skip.
+
+    The model cannot start later than 2023/1, later loans are forecast from
+    there and the first months of the forecast are dropped.
+    """
+    model_sy = start_year
+    model_sm = start_month
+
+    if (start_year > MODEL_LAST_START_YEAR):
+        model_sy = MODEL_LAST_START_YEAR
+        model_sm = MODEL_LAST_START_MONTH
+    elif (start_year == MODEL_LAST_START_YEAR):
+        if (start_month > MODEL_LAST_START_MONTH):
+            model_sm = MODEL_LAST_START_MONTH
+
+    offset = diff_month(datetime(start_year, start_month, 1),
+                        datetime(model_sy, model_sm, 1))
+    offset = offset if offset > 0 else 0
+    return model_sy, model_sm, offset
+
+
+def month_labels(start_year, start_month, count):
+    month_index = start_month - 1 + np.arange(count)
+    return [f"{start_year + m // 12}/{m % 12 + 1}" for m in month_index.tolist()]
+
+
+def real_income(household_income, predicted_inflation, start_month):
+    """Income deflated by every month's inflation, with a raise every January.
+
+    predicted_inflation is one path, shape (months,), or many, (paths, months).
+    """
+    factors = loan_engine.inflation_factors(predicted_inflation)
+    is_january = (start_month - 1 + np.arange(factors.shape[-1])) % 12 == 0
+    factors = np.where(is_january, factors * JANUARY_RAISE, factors)
+
+    # The first month is the income as entered
+    factors[..., 0] = 1.0
+    return household_income * np.cumprod(factors, axis=-1)
+
+
+def scenario_bands(sim, household_income, monthly_expenses, predicted_inflation,
+                   percentiles=BAND_PERCENTILES) -> ScenarioBands:
+    """Percentiles of real income and expenses over many inflation paths.
+
+    Args:
+        sim: The Simulation of the forecast path, for the loans and months.
+        household_income: Monthly household income at the start.
+        monthly_expenses: Monthly expenses other than the loans.
+        predicted_inflation: Monthly inflation in % of sim's months, shape (paths, months).
+        percentiles: The percentiles to keep.
+
+    Returns:
+        The ScenarioBands.
+    """
+    predicted_inflation = np.asarray(predicted_inflation, dtype=float)
+    income = real_income(household_income, predicted_inflation, sim.start_month)
+    expenses = monthly_expenses + loan_engine.real_loan_totals(
+        [x.installment_payment for x in sim.loans], sim.start_offset,
+        sim.loan_lengths, predicted_inflation)
+
+    return ScenarioBands(
+        percentiles=tuple(percentiles),
+        samples=len(predicted_inflation),
+        real_income=np.percentile(income, percentiles, axis=0),
+        real_expenses=np.percentile(expenses, percentiles, axis=0),
+        disposal=np.percentile(income - expenses, percentiles, axis=0),
+    )
+
+
+def loan_key(loan):
+    # Loans with the same terms have the same payments, whatever their order
+    return (loan.name, loan.start_year, loan.start_month,
+            loan.installment_months, loan.installment_payment)
+
+
+class Simulator:
+    """Runs simulations, reusing work from the previous ones.
+
+    The inflation forecast is cached per model start date and only redone
+    when a simulation needs more months than already forecast. Real payments
+    are cached per loan, so adding or removing a loan only computes that loan.
+    Both are dropped when the forecast version (data, model) changes.
+    """
+
+    def __init__(self, forecast=None, max_loans=1024, scenarios=None, version=None):
+        """
+        Args:
+            forecast: Called as forecast(start_year, start_month, num_of_months)
+                and returns monthly inflation in %. Defaults to the CPI model.
+            max_loans: How many loans to keep results for.
+            scenarios: Like forecast, but returns many inflation paths, shape
+                (paths, num_of_months). Defaults to the model's Monte Carlo paths.
+            version: Called with no arguments, returns the version of the
+                forecasts. Defaults to the model's when forecast is not given.
+        """
+        self.forecast = forecast
+        self.scenarios = scenarios
+        self.version = version
+        self.current_version = None
+        self.max_loans = max_loans
+        # (model_sy, model_sm) -> the longest inflation forecast so far
+        self.inflation = {}
+        # (loan_key, model_sy, model_sm) -> real payments, least recent first
+        self.payments = collections.OrderedDict()
+        self.stats = {"forecasts": 0, "loan_hits": 0, "loan_misses": 0}
+
+    def clear(self):
+        self.inflation.clear()
+        self.payments.clear()
+
+    def check_version(self):
+        # A new model or new data makes every cached forecast and payment stale
+        version = self.version
+        if version is None:
+            if self.forecast is not None:
+                return
+            from pynecone.model import forecast_version as version
+
+        current = version()
+        if current != self.current_version:
+            self.clear()
+            self.current_version = current
+
+    def forecast_from(self, model_sy, model_sm, num_of_months):
+        cached = self.inflation.get((model_sy, model_sm))
+        if cached is None or len(cached) < num_of_months:
+            forecast = self.forecast
+            if forecast is None:
+                from pynecone.model import forecast_future_CPI as forecast
+
+            # The forecast of a longer period starts with the shorter one
+            cached = np.asarray(
+                forecast(model_sy, model_sm, num_of_months), dtype=float)
+            self.inflation[(model_sy, model_sm)] = cached
+            self.stats["forecasts"] += 1
+        return cached
+
+    def loan_payments(self, loans, model_offsets, model_sy, model_sm, inflation):
+        keys = [(loan_key(x), model_sy, model_sm) for x in loans]
+        missing = [i for i, key in enumerate(keys) if key not in self.payments]
+        self.stats["loan_hits"] += len(loans) - len(missing)
+        self.stats["loan_misses"] += len(missing)
+
+        if missing:
+            payments, _ = loan_engine.real_loan_payments(
+                [loans[i].installment_payment for i in missing],
+                model_offsets[missing],
+                [loans[i].installment_months for i in missing],
+                inflation,
+            )
+            for row, i in enumerate(missing):
+                length = min(loans[i].installment_months,
+                             max(len(inflation) - model_offsets[i], 0))
+                self.payments[keys[i]] = payments[row, :length]
+
+        result = []
+        for key in keys:
+            self.payments.move_to_end(key)
+            result.append(self.payments[key])
+
+        while len(self.payments) > self.max_loans:
+            self.payments.popitem(last=False)
+        return result
+
+    def simulate(self, loans, household_income, monthly_expenses) -> Simulation:
+        """Simulate real income and real loan payments from the first loan to the last.
+
+        Args:
+            loans: The Loan objects, at least one.
+            household_income: Monthly household income at the start.
+            monthly_expenses: Monthly expenses other than the loans.
+
+        Returns:
+            The Simulation.
+        """
+        with telemetry.span("loan_simulation", loans=len(loans)):
+            return self._simulate(loans, household_income, monthly_expenses)
+
+    def _simulate(self, loans, household_income, monthly_expenses) -> Simulation:
+        self.check_version()
+        start_year, start_month, end_year, end_month = loans_span(loans)
+        period_from_starting_date = diff_month(
+            datetime(end_year, end_month, 1), datetime(start_year, start_month, 1))
+
+        model_sy, model_sm, offset = forecast_window(start_year, start_month)
+        inflation = self.forecast_from(
+            model_sy, model_sm, period_from_starting_date + offset)
+
+        # now only predicted inflation from required loan start date till the end of all loans
+        predicted_inflation = inflation[offset: offset + period_from_starting_date]
+        months = month_labels(start_year, start_month, len(predicted_inflation))
+
+        start_offset = np.array([
+            abs(diff_month(datetime(x.start_year, x.start_month, 1), datetime(start_year, start_month, 1)))
+            for x in loans])
+
+        per_loan = self.loan_payments(
+            loans, start_offset + offset, model_sy, model_sm, inflation)
+        loan_lengths = np.clip(
+            np.array([len(x) for x in per_loan]), 0, len(months) - start_offset)
+
+        real_payments = np.zeros((len(loans), int(loan_lengths.max())))
+        for i, payments in enumerate(per_loan):
+            real_payments[i, :loan_lengths[i]] = payments[:loan_lengths[i]]
+        real_loan_total = loan_engine.monthly_total(
+            real_payments, start_offset, loan_lengths, len(months))
+
+        return Simulation(
+            loans=list(loans),
+            start_year=start_year,
+            start_month=start_month,
+            end_year=end_year,
+            end_month=end_month,
+            months=months,
+            predicted_inflation=predicted_inflation,
+            start_offset=start_offset,
+            loan_lengths=loan_lengths,
+            real_payments=real_payments,
+            real_loan_total=real_loan_total,
+            real_income=real_income(household_income, predicted_inflation, start_month),
+            real_expenses=monthly_expenses + real_loan_total,
+            bands=None,
+        )
+
+    def scenario_bands(self, sim, household_income, monthly_expenses) -> ScenarioBands:
+        """Risk bands around sim over the inflation scenarios, see scenario_bands."""
+        model_sy, model_sm, offset = forecast_window(sim.start_year, sim.start_month)
+        scenarios = self.scenarios
+        if scenarios is None:
+            from pynecone.model import forecast_scenarios as scenarios
+
+        with telemetry.span("scenario_simulation", loans=len(sim.loans)) as fields:
+            paths = np.asarray(scenarios(model_sy, model_sm, len(sim.months) + offset))
+            fields["samples"] = len(paths)
+            return scenario_bands(sim, household_income, monthly_expenses, paths[:, offset:])
+
+
+def simulate(loans, household_income, monthly_expenses, forecast=None) -> Simulation:
+    """One off simulation without keeping anything, see Simulator.simulate."""
+    return Simulator(forecast).simulate(loans, household_income, monthly_expenses)
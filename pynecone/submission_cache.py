@@ -0,0 +1,89 @@
+"""Results of recent submissions, per browser session.
+
+Submitting the same income, expenses and loans again reuses the figures and
+descriptions instead of running the forecast, simulation and plotly build
+again. Results are only reused with the DOSM data, model and model bundle
+they were computed from.
+"""
+
+import collections
+import hashlib
+import json
+import os
+
+from pynecone import datasets, model_bundle, model_registry, simulation
+
+# Results kept per session, and sessions kept at all
+CACHE_SIZE = int(os.environ.get("ECONOME_SUBMISSION_CACHE_SIZE", 8))
+MAX_SESSIONS = int(os.environ.get("ECONOME_SUBMISSION_SESSIONS", 1024))
+
+# session -> key -> (version, result), least recently used first
+_sessions = collections.OrderedDict()
+stats = {"hits": 0, "misses": 0}
+
+
+def submission_key(household_income, monthly_expenses, loans):
+    """Canonical hash of a submission, None if a loan does not parse.
+
+    Loans are compared by the terms the simulation sees, so "05" and "5"
+    are the same loan. Their order is kept, it is the order of the figures.
+    """
+    try:
+        terms = [simulation.loan_key(simulation.parse_loan(loanData)) for loanData in loans]
+    except (KeyError, ValueError, ZeroDivisionError):
+        return None
+    canonical = {
+        "income": float(household_income),
+        "expenses": float(monthly_expenses),
+        "loans": [[name.strip(), *rest] for name, *rest in terms],
+    }
+    return hashlib.sha256(json.dumps(canonical).encode()).hexdigest()
+
+
+def data_version():
+    # Anything that changes the forecast, so results from before do not count
+    sha = hashlib.sha256()
+    for url in datasets.ALL_URLS:
+        sha.update(datasets.content_hash(url).encode())
+    sha.update(datasets.cached_file_hash(model_registry.MODEL_PATH).encode())
+    sha.update(model_bundle.file_hash(model_registry.MODEL_PATH).encode())
+    return sha.hexdigest()
+
+
+def get(session, key):
+    entries = _sessions.get(session)
+    if key is None or entries is None or key not in entries:
+        stats["misses"] += 1
+        return None
+
+    version, result = entries[key]
+    if version != data_version():
+        del entries[key]
+        stats["misses"] += 1
+        return None
+
+    entries.move_to_end(key)
+    _sessions.move_to_end(session)
+    stats["hits"] += 1
+    return result
+
+
+def put(session, key, result):
+    if key is None:
+        return
+    entries = _sessions.setdefault(session, collections.OrderedDict())
+    entries[key] = (data_version(), result)
+    entries.move_to_end(key)
+    _sessions.move_to_end(session)
+
+    while len(entries) > CACHE_SIZE:
+        entries.popitem(last=False)
+    while len(_sessions) > MAX_SESSIONS:
+        _sessions.popitem(last=False)
+
+
+def clear(session=None):
+    if session is None:
+        _sessions.clear()
+    else:
+        _sessions.pop(session, None)
@@ -0,0 +1,126 @@
+"""Timing spans for the submit pipeline.
+
+Every span is logged as one JSON line on the "econome.telemetry" logger and
+added to a per stage histogram, which pynecone.pynecone serves in the
+Prometheus text format on /metrics when ECONOME_METRICS=1.
+"""
+
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+
+LOG_SPANS = os.environ.get("ECONOME_LOG_SPANS", "1") == "1"
+METRICS_ENDPOINT = os.environ.get("ECONOME_METRICS", "0") == "1"
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+logger = logging.getLogger("econome.telemetry")
+if not logger.handlers:
+    logger.addHandler(logging.StreamHandler())
+    logger.setLevel(logging.INFO)
+
+_lock = threading.Lock()
+# stage -> {"count", "sum", "buckets"}
+_stats = {}
+# Set while collect() is active, spans are also appended to it
+_collected = contextvars.ContextVar("econome_collected_spans", default=None)
+
+
+def _add(stage, seconds):
+    with _lock:
+        stats = _stats.setdefault(
+            stage, {"count": 0, "sum": 0.0, "buckets": [0] * len(BUCKETS)})
+        stats["count"] += 1
+        stats["sum"] += seconds
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                stats["buckets"][i] += 1
+
+
+def record(stage, seconds, **fields):
+    _add(stage, seconds)
+
+    collected = _collected.get()
+    if collected is not None:
+        collected.append((stage, seconds))
+
+    if LOG_SPANS:
+        logger.info(json.dumps(
+            {"span": stage, "ms": round(seconds * 1000, 3), **fields}, default=str))
+
+
+@contextlib.contextmanager
+def span(stage, **fields):
+    """Time the block as one stage, extra fields go into the log line.
+
+    The yielded dict can be filled in inside the block, e.g. with a size.
+    """
+    started = time.perf_counter()
+    try:
+        yield fields
+    finally:
+        record(stage, time.perf_counter() - started, **fields)
+
+
+@contextlib.contextmanager
+def collect():
+    """Collect the (stage, seconds) of every span recorded inside the block.
+
+    Used by the worker processes to ship their spans back to the server.
+    """
+    spans = []
+    token = _collected.set(spans)
+    try:
+        yield spans
+    finally:
+        _collected.reset(token)
+
+
+def merge(spans):
+    # Spans from another process, already logged there
+    for stage, seconds in spans:
+        _add(stage, seconds)
+
+
+def prometheus_text():
+    lines = [
+        "# HELP econome_stage_seconds Time spent in each submit pipeline stage.",
+        "# TYPE econome_stage_seconds histogram",
+    ]
+    with _lock:
+        for stage, stats in sorted(_stats.items()):
+            for bound, count in zip(BUCKETS, stats["buckets"]):
+                lines.append(
+                    f'econome_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}')
+            lines.append(
+                f'econome_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {stats["count"]}')
+            lines.append(f'econome_stage_seconds_sum{{stage="{stage}"}} {stats["sum"]}')
+            lines.append(f'econome_stage_seconds_count{{stage="{stage}"}} {stats["count"]}')
+    return "\n".join(lines) + "\n"
+
+
+async def metrics_endpoint():
+    from starlette.responses import PlainTextResponse
+
+    return PlainTextResponse(prometheus_text(), media_type="text/plain; version=0.0.4")
+
+
+def serialization_middleware():
+    """Reflex middleware timing how long a state update takes to serialize."""
+    from reflex.middleware import Middleware
+
+    class SerializationMiddleware(Middleware):
+        async def preprocess(self, app, state, event):
+            return None
+
+        async def postprocess(self, app, state, event, update):
+            with span("state_serialization", event=event.name) as fields:
+                fields["bytes"] = len(update.json())
+            return update
+
+    return SerializationMiddleware()
@@ -0,0 +1,58 @@
+"""Training only code for the CPI model: dataset split and scaler fitting.
+
+Kept out of pynecone.model so the server never imports sklearn splitting
+code or builds the training set unless it actually needs to.
+"""
+
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+from pynecone import features, model
+from pynecone.features import build_windows
+
+train_ratio = features.TRAIN_RATIO
+val_ratio = features.VAL_RATIO
+test_ratio = features.TEST_RATIO
+
+
+def load_windows():
+    return build_windows(model.read_data(), model.input_columns,
+                         model.target_column, model.target_forecast_months)
+
+
+def split_dataset(X, y):
+    val_size_cum = features.test_start(len(X))
+
+    X_train_total, y_train_total = X[: val_size_cum], y[: val_size_cum]
+    X_train, X_val, y_train, y_val = train_test_split(
+        X_train_total, y_train_total, test_size=val_ratio, random_state=42)
+    X_test, y_test = X[val_size_cum:], y[val_size_cum:]
+
+    return X_train, X_val, X_test, y_train, y_val, y_test
+
+
+def fit_scalers():
+    # The scalers the shipped model was trained with are fitted on X_train
+    X, y = load_windows()
+    X_train, _, _, y_train, _, _ = split_dataset(X, y)
+
+    scaler_x = StandardScaler().fit(X_train)
+    scaler_y = StandardScaler().fit(y_train)
+    return scaler_x, scaler_y
+
+
+if __name__ == "__main__":
+    X, y = load_windows()
+    X_train, X_val, X_test, y_train, y_val, y_test = split_dataset(X, y)
+    scaler_x, scaler_y = fit_scalers()
+
+    print("Train : " + str(len(X_train)))
+    print("Val : " + str(len(X_val)))
+    print("Test : " + str(len(X_test)))
+
+    print("Train X shape : " + str(scaler_x.transform(X_train).shape))
+    print("Train Y shape : " + str(scaler_y.transform(y_train).shape))
+    print("Val X shape : " + str(scaler_x.transform(X_val).shape))
+    print("Val Y shape : " + str(scaler_y.transform(y_val).shape))
+    print("Test X shape : " + str(scaler_x.transform(X_test).shape))
+    print("Test Y shape : " + str(scaler_y.transform(y_test).shape))
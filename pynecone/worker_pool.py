@@ -0,0 +1,238 @@
+"""Bounded process pool running the forecast and loan simulation.
+
+The workers preload the data, scalers and model once, so the event loop only
+waits on a future instead of doing the number crunching itself.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from pynecone import telemetry
+
+POOL_SIZE = int(os.environ.get("ECONOME_POOL_SIZE", 2))
+# Submissions allowed to wait for a worker before new ones are turned away
+QUEUE_LIMIT = int(os.environ.get("ECONOME_POOL_QUEUE", POOL_SIZE * 2))
+# How long a warmed worker waits for the others, and how often warm-up is tried
+WARM_UP_TIMEOUT = float(os.environ.get("ECONOME_WARM_UP_TIMEOUT", 300))
+WARM_UP_ATTEMPTS = int(os.environ.get("ECONOME_WARM_UP_ATTEMPTS", 3))
+WARM_UP_RETRY_SECONDS = 5.0
+
+
+class PoolSaturated(Exception):
+    """Every worker is busy and the queue is full."""
+
+
+_executor = None
+_in_flight = 0
+# Set by warm_up, served on /ready
+readiness = {"ready": False, "warm_up_seconds": None, "error": None}
+_warm_up_task = None
+
+# Per worker process, keeps forecasts and loan results between submissions
+_simulator = None
+# Per worker process, shared by the workers of one pool
+_warm_up_barrier = None
+# Per worker process, what the initializer raised
+_init_error = None
+
+
+def _init_worker(warm_up_barrier):
+    global _warm_up_barrier, _init_error
+    from pynecone import model, model_registry, numpy_model
+
+    _warm_up_barrier = warm_up_barrier
+    # Raising here would break the pool and only report BrokenProcessPool,
+    # keep the error and raise it from every task instead
+    try:
+        model.read_data()
+        model.get_scalers()
+        if numpy_model.get(model_registry.MODEL_PATH) is None:
+            model_registry.get_model(model_registry.MODEL_PATH)
+    except Exception as e:
+        _init_error = e
+
+
+def _check_init():
+    if _init_error is not None:
+        raise _init_error
+
+
+def _simulate(loans_from_user, household_income, monthly_expenses):
+    global _simulator
+    from pynecone import simulation
+
+    _check_init()
+    if _simulator is None:
+        _simulator = simulation.Simulator()
+
+    loans = [simulation.parse_loan(loanData) for loanData in loans_from_user]
+    with telemetry.collect() as spans:
+        sim = _simulator.simulate(loans, household_income, monthly_expenses)
+        sim.bands = _simulator.scenario_bands(sim, household_income, monthly_expenses)
+    return sim, spans
+
+
+def _warm_worker():
+    # The first predict pays graph tracing and allocations, do it before any user does
+    from pynecone import model, simulation
+
+    if _init_error is not None:
+        # The other workers would wait on the barrier until WARM_UP_TIMEOUT
+        _warm_up_barrier.abort()
+        _check_init()
+    with telemetry.collect() as spans:
+        model.forecast_future_CPI(
+            simulation.MODEL_LAST_START_YEAR, simulation.MODEL_LAST_START_MONTH,
+            model.max_forecast_months)
+        model.backtest_residuals()
+    # Hold this worker until every worker has a warm-up task, so one fast
+    # worker cannot take two of them and leave another one cold
+    _warm_up_barrier.wait(WARM_UP_TIMEOUT)
+    return os.getpid(), spans
+
+
+def get_executor():
+    global _executor
+
+    if _executor is None:
+        # spawn, TensorFlow does not survive being forked
+        context = multiprocessing.get_context("spawn")
+        _executor = ProcessPoolExecutor(
+            max_workers=POOL_SIZE,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(context.Barrier(POOL_SIZE),),
+        )
+    return _executor
+
+
+def discard_executor(executor):
+    # A worker died and took the pool with it, the next call starts a new one
+    global _executor
+
+    if _executor is executor:
+        _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def in_flight():
+    return _in_flight
+
+
+async def run_simulation(loans_from_user, household_income, monthly_expenses):
+    """Run simulation.simulate for the form data in a worker process.
+
+    Args:
+        loans_from_user: The loan form dicts.
+        household_income: Monthly household income.
+        monthly_expenses: Monthly expenses other than the loans.
+
+    Returns:
+        The Simulation.
+
+    Raises:
+        PoolSaturated: Too many submissions are already waiting.
+        BrokenProcessPool: A worker died, the pool is replaced and warmed again.
+    """
+    global _in_flight
+
+    if _in_flight >= QUEUE_LIMIT:
+        raise PoolSaturated()
+
+    _in_flight += 1
+    try:
+        loop = asyncio.get_running_loop()
+        executor = get_executor()
+        with telemetry.span("worker_pool", loans=len(loans_from_user)):
+            try:
+                sim, spans = await loop.run_in_executor(
+                    executor, _simulate, loans_from_user, household_income, monthly_expenses)
+            except BrokenProcessPool:
+                # The next pool starts cold, so it is not ready until it is warm
+                discard_executor(executor)
+                readiness["ready"] = False
+                start_warm_up()
+                raise
+        telemetry.merge(spans)
+        return sim
+    finally:
+        _in_flight -= 1
+
+
+async def _warm_pool():
+    loop = asyncio.get_running_loop()
+    executor = get_executor()
+    try:
+        with telemetry.span("warm_up", workers=POOL_SIZE) as fields:
+            results = await asyncio.gather(*[
+                loop.run_in_executor(executor, _warm_worker)
+                for _ in range(POOL_SIZE)], return_exceptions=True)
+            errors = [result for result in results if isinstance(result, BaseException)]
+            if errors:
+                # The worker that failed, not the ones it broke the barrier for
+                error = next((error for error in errors
+                              if not isinstance(error, threading.BrokenBarrierError)), errors[0])
+                if isinstance(error, asyncio.CancelledError):
+                    # A broken submission discarded the pool under the warm-up
+                    raise RuntimeError("The pool was replaced during the warm-up")
+                raise error
+            fields["pids"] = sorted({pid for pid, _ in results})
+        if len(fields["pids"]) != POOL_SIZE:
+            raise RuntimeError(
+                f"{len(fields['pids'])} of {POOL_SIZE} workers answered the warm-up")
+    except Exception:
+        # The barrier is broken or a worker is gone, warm a new pool instead
+        discard_executor(executor)
+        raise
+    return results
+
+
+async def warm_up():
+    """Start every worker and run a forecast in it, then report ready.
+
+    Each worker loads the data and model in its initializer, the warm-up
+    forecast then runs the first prediction. Ready is only reported once every
+    worker of the pool has answered. A failed warm-up is retried on a new pool,
+    after the last attempt the server stays not ready with the error on /ready.
+    """
+    readiness["ready"] = False
+    started = time.perf_counter()
+    for attempt in range(WARM_UP_ATTEMPTS):
+        try:
+            results = await _warm_pool()
+            break
+        except Exception as e:
+            readiness["error"] = f"{type(e).__name__}: {e}"
+            telemetry.logger.error(
+                f"Warm-up attempt {attempt + 1} of {WARM_UP_ATTEMPTS} failed: "
+                f"{readiness['error']}")
+            if attempt + 1 < WARM_UP_ATTEMPTS:
+                await asyncio.sleep(WARM_UP_RETRY_SECONDS * 2 ** attempt)
+    else:
+        return
+
+    for _, spans in results:
+        telemetry.merge(spans)
+    readiness["error"] = None
+    readiness["warm_up_seconds"] = time.perf_counter() - started
+    readiness["ready"] = True
+
+
+def start_warm_up():
+    # Startup handler and after a broken pool, the server accepts connections
+    # while the workers warm up. A warm-up already running retries on a new pool
+    global _warm_up_task
+
+    if _warm_up_task is None or _warm_up_task.done():
+        _warm_up_task = asyncio.get_running_loop().create_task(warm_up())
+
+
+async def readiness_endpoint():
+    from starlette.responses import JSONResponse
+
+    return JSONResponse(readiness, status_code=200 if readiness["ready"] else 503)
@@ -0,0 +1,72 @@
+import http.server
+import json
+import os
+import tempfile
+import threading
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# pynecone.model reads the DOSM data at import, serve it the benchmark fixtures
+FIXTURE_DIR = tempfile.mkdtemp(prefix="econome-test-")
+os.environ["ECONOME_DATA_DIR"] = FIXTURE_DIR
+os.environ["ECONOME_OFFLINE"] = "1"
+os.environ["ECONOME_ALLOW_REFIT"] = "1"
+os.environ.setdefault("ECONOME_LOG_SPANS", "0")
+
+from benchmarks.fetch import start_stand_in  # noqa: E402
+from benchmarks.fixtures import write_fixtures  # noqa: E402
+
+write_fixtures(FIXTURE_DIR)
+
+
+@pytest.fixture(autouse=True)
+def repo_root(monkeypatch):
+    # The model paths are relative to the repository root, like in the app
+    monkeypatch.chdir(ROOT)
+
+
+@pytest.fixture
+def stand_in(tmp_path):
+    """Local DOSM stand-in serving the files of its handler.directory."""
+    served = tmp_path / "served"
+    served.mkdir()
+    server = start_stand_in(str(served))
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class AdviceStub(http.server.BaseHTTPRequestHandler):
+    # Answers {"prompt"} with {"content"} like ECONOME_ADVICE_URL expects
+    delay = 0.0
+    prompts = None
+
+    def do_POST(self):
+        prompt = json.loads(self.rfile.read(int(self.headers["Content-Length"])))["prompt"]
+        self.prompts.append(prompt)
+        time.sleep(self.delay)
+        content = json.dumps({"content": f"Advice on: {prompt}"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def advice_stub():
+    """Local advice endpoint, set handler.delay to make it slow."""
+    handler = type("AdviceStub", (AdviceStub,), {"prompts": []})
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.handler = handler
+    server.url = f"http://127.0.0.1:{server.server_port}/advice"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
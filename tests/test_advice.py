@@ -0,0 +1,57 @@
+import asyncio
+import importlib
+
+import pytest
+
+from pynecone import advice
+
+
+@pytest.fixture
+def stub(advice_stub, tmp_path, monkeypatch):
+    # advice reads its settings at import, like the server does
+    monkeypatch.setenv("ECONOME_ADVICE_URL", advice_stub.url)
+    monkeypatch.delenv("ECONOME_ADVICE_CACHE", raising=False)
+    importlib.reload(advice)
+    yield advice_stub
+    monkeypatch.undo()
+    importlib.reload(advice)
+
+
+def test_prompts_go_to_the_advice_url(stub):
+    assert advice.ADVICE_URL == stub.url
+    answer = asyncio.run(advice.ask("session", "two loans", key="k"))
+
+    assert answer == "Advice on: two loans"
+    assert stub.handler.prompts == ["two loans"]
+
+
+def test_a_cached_key_is_not_asked_again(stub):
+    async def twice():
+        return [await advice.ask("session", "two loans", key="k") for _ in range(2)]
+
+    assert asyncio.run(twice()) == ["Advice on: two loans"] * 2
+    assert stub.handler.prompts == ["two loans"]
+    assert advice.cache_stats == {"hits": 1, "misses": 1}
+
+
+def test_a_slow_answer_times_out(stub):
+    stub.handler.delay = 0.5
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(advice.ask("session", "two loans", timeout=0.05))
+    assert "session" not in advice._pending
+
+
+def test_a_newer_request_cancels_the_older_one(stub):
+    stub.handler.delay = 0.3
+
+    async def resubmit():
+        older = asyncio.ensure_future(advice.ask("session", "first"))
+        await asyncio.sleep(0.05)
+        newer = await advice.ask("session", "second")
+        return older, newer
+
+    older, newer = asyncio.run(resubmit())
+    assert older.cancelled()
+    assert newer == "Advice on: second"
+    assert advice._pending == {}
@@ -0,0 +1,111 @@
+import multiprocessing
+
+import pytest
+
+from benchmarks.fixtures import write_fixtures
+from pynecone import datasets
+
+
+def store_many(directory, worker, count):
+    datasets.CACHE_DIR = directory
+    for i in range(count):
+        datasets.store_snapshot(f"https://example.test/{worker}/file{worker}_{i}.parquet", b"x")
+
+
+def test_manifest_updates_from_many_processes_are_kept(tmp_path, monkeypatch):
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=store_many, args=(str(tmp_path), worker, 50))
+                 for worker in range(2)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    monkeypatch.setattr(datasets, "CACHE_DIR", str(tmp_path))
+    assert len(datasets.read_manifest()) == 100
+
+
+def test_not_modified_renews_the_entry(tmp_path, monkeypatch):
+    monkeypatch.setattr(datasets, "CACHE_DIR", str(tmp_path))
+    url = "https://example.test/cpi.parquet"
+    datasets.store_snapshot(url, b"data", etag='"v1"')
+    entry = datasets.read_manifest()[url]
+
+    # The entry can be gone from the manifest, the 304 restores it
+    datasets.write_manifest({})
+    datasets.mark_fresh(url, entry)
+
+    renewed = datasets.read_manifest()[url]
+    assert renewed["etag"] == '"v1"'
+    assert renewed["fetched_at"] >= entry["fetched_at"]
+
+
+def test_cached_file_hash_only_rehashes_changed_files(tmp_path, monkeypatch):
+    path = tmp_path / "model.h5"
+    path.write_bytes(b"weights")
+    hashed = []
+    file_hash = datasets.file_hash
+    monkeypatch.setattr(datasets, "file_hash", lambda p: hashed.append(p) or file_hash(p))
+
+    first = datasets.cached_file_hash(str(path))
+    assert datasets.cached_file_hash(str(path)) == first
+    assert len(hashed) == 1
+
+    path.write_bytes(b"retrained weights")
+    assert datasets.cached_file_hash(str(path)) == file_hash(str(path)) != first
+    assert len(hashed) == 2
+
+
+@pytest.fixture
+def online(stand_in, tmp_path, monkeypatch):
+    # Fetch the fixture files from the stand-in into an empty cache
+    write_fixtures(stand_in.handler.directory)
+    monkeypatch.setattr(datasets, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(datasets, "MIRROR", f"http://127.0.0.1:{stand_in.server_port}")
+    monkeypatch.setattr(datasets, "OFFLINE", False)
+    return stand_in
+
+
+def test_fetch_downloads_then_asks_conditionally(online):
+    url = datasets.URL_CPI
+    path, status = datasets.fetch(url, datasets.read_manifest())
+    assert status == "downloaded"
+    entry = datasets.read_manifest()[url]
+    assert online.handler.requests == [("/cpi/cpi_headline.parquet", None)]
+    assert entry["etag"] and entry["sha256"] == datasets.file_hash(path)
+
+    online.handler.bytes_sent = 0
+    path, status = datasets.fetch(url, datasets.read_manifest())
+    assert status == "not_modified"
+    assert online.handler.requests[-1] == ("/cpi/cpi_headline.parquet", entry["etag"])
+    assert online.handler.bytes_sent == 0
+    assert datasets.read_manifest()[url]["fetched_at"] >= entry["fetched_at"]
+
+
+def test_refresh_downloads_a_changed_file(online):
+    datasets.fetch_all()
+    before = datasets.content_hash(datasets.URL_PPI)
+    write_fixtures(online.handler.directory, seed=1)
+
+    results = datasets.refresh_all()
+    assert {result["status"] for result in results.values()} == {"downloaded"}
+    assert datasets.content_hash(datasets.URL_PPI) != before
+
+
+def test_a_corrupted_snapshot_is_downloaded_unconditionally(online):
+    datasets.fetch_all()
+    with open(datasets.cache_path(datasets.URL_IPI), "ab") as f:
+        f.write(b"truncated")
+
+    _, status = datasets.resolve(datasets.URL_IPI)
+    assert status == "downloaded"
+    assert online.handler.requests[-1] == ("/ipi/ipi.parquet", None)
+
+
+def test_unreachable_dosm_serves_the_last_snapshot(online):
+    datasets.fetch_all()
+    online.shutdown()
+    online.server_close()
+
+    _, status = datasets.resolve(datasets.URL_LABOUR, refresh=True)
+    assert status == "stale"
@@ -0,0 +1,128 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.fixtures import COLUMNS, write_fixtures
+from pynecone import features
+from pynecone.features import build_windows, centered_trend, extend_trend
+
+INPUT_COLUMNS = ["a_trend", "b_trend"]
+TARGET_COLUMN = ["cpi_overall"]
+HORIZONS = [3, 6, 9, 12]
+
+
+def frame(months, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "cpi_overall": 100 + rng.normal(size=months).cumsum(),
+        "a_trend": rng.normal(size=months),
+        "b_trend": rng.normal(size=months),
+    }, index=pd.date_range("2010-01-01", periods=months, freq="MS"))
+
+
+def legacy_windows(data, input_columns, target_column, horizons):
+    # The iloc loop build_windows replaced
+    X, y = [], []
+    for i in range(len(data) - max(horizons)):
+        X.append(data[input_columns].iloc[i])
+        y.append([data[target_column].iloc[i + j].iloc[0] for j in horizons])
+    return np.array(X), np.array(y)
+
+
+@pytest.mark.parametrize("months", [13, 14, 60, 162])
+def test_build_windows_matches_iloc_loop(months):
+    data = frame(months)
+    X, y = build_windows(data, INPUT_COLUMNS, TARGET_COLUMN, HORIZONS)
+    expected_X, expected_y = legacy_windows(data, INPUT_COLUMNS, TARGET_COLUMN, HORIZONS)
+
+    np.testing.assert_array_equal(X, expected_X)
+    np.testing.assert_array_equal(y, expected_y)
+
+
+@pytest.mark.parametrize("months", [0, 5, 12])
+def test_build_windows_too_short(months):
+    X, y = build_windows(frame(months), INPUT_COLUMNS, TARGET_COLUMN, HORIZONS)
+
+    assert X.shape == (0, len(INPUT_COLUMNS))
+    assert y.shape == (0, len(HORIZONS))
+
+
+@pytest.fixture(scope="module")
+def fixture_values(tmp_path_factory):
+    # Every column of the benchmark fixtures, (months, columns)
+    directory = write_fixtures(str(tmp_path_factory.mktemp("dosm")))
+    frames = [pd.read_parquet(os.path.join(directory, os.path.basename(url)))
+              .set_index("date")[columns] for url, columns in COLUMNS.items()]
+    return pd.concat(frames, axis=1)
+
+
+def test_centered_trend_matches_seasonal_decompose(fixture_values):
+    seasonal = pytest.importorskip("statsmodels.tsa.seasonal")
+
+    expected = np.column_stack([
+        seasonal.seasonal_decompose(fixture_values.iloc[:, i], model='additive', period=12)
+        .trend.ffill().bfill().to_numpy()
+        for i in range(fixture_values.shape[1])])
+
+    np.testing.assert_allclose(centered_trend(fixture_values.to_numpy()), expected,
+                               rtol=0, atol=1e-10)
+
+
+@pytest.mark.parametrize("split", [1, 12, 13, 24, 100, 161])
+def test_extend_trend_matches_full_recompute(fixture_values, split):
+    values = fixture_values.to_numpy()
+    _, extended = extend_trend(values[:split], centered_trend(values[:split]), values[split:])
+
+    np.testing.assert_allclose(extended, centered_trend(values), rtol=0, atol=1e-10)
+
+
+def test_extend_trend_month_by_month(fixture_values):
+    values = fixture_values.to_numpy()
+    known, trend = values[:30], centered_trend(values[:30])
+    for month in range(30, len(values)):
+        known, trend = extend_trend(known, trend, values[month:month + 1])
+
+    np.testing.assert_allclose(trend, centered_trend(values), rtol=0, atol=1e-10)
+
+
+@pytest.mark.parametrize("windows", [10, 137, 150])
+def test_backtest_starts_at_the_test_split(windows):
+    training = pytest.importorskip("pynecone.training")
+    X = np.arange(windows, dtype=float)[:, None]
+    *_, X_test, _, _, _ = training.split_dataset(X, X)
+
+    assert X_test[0, 0] == features.test_start(windows)
+    assert len(X_test) == windows - features.test_start(windows)
+
+
+def test_extend_trend_without_new_months(fixture_values):
+    values = fixture_values.to_numpy()
+    trend = centered_trend(values)
+    known, extended = extend_trend(values, trend, values[:0])
+
+    np.testing.assert_array_equal(known, values)
+    np.testing.assert_array_equal(extended, trend)
+
+
+def test_features_rebuilt_from_a_frame_with_the_same_months():
+    # The features key changed but the used months did not, e.g. another column
+    # of a dataset was revised or FEATURES_VERSION was bumped
+    from pynecone import model
+
+    data = model.read_data()
+    pd.testing.assert_frame_equal(model.build_features(data), data)
+
+
+def test_previous_features_only_of_the_same_version(tmp_path, monkeypatch):
+    from pynecone import datasets, model
+
+    monkeypatch.setattr(datasets, "CACHE_DIR", str(tmp_path))
+    data = model.read_data()
+    data.to_parquet(tmp_path / "features-old.parquet")
+    data.to_parquet(tmp_path / f"features-v{model.FEATURES_VERSION - 1}-old.parquet")
+    assert model._previous_features() is None
+
+    data.to_parquet(model._features_path("old"))
+    pd.testing.assert_frame_equal(model._previous_features(), data)
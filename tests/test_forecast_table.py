@@ -0,0 +1,33 @@
+import os
+
+import numpy as np
+
+from pynecone import forecast_table
+
+
+def write_table(path, version, forecast):
+    np.savez(path, months=np.array([24240], dtype=np.int32),
+             initial_cpi=np.array([100.0]), forecast=np.array([[forecast] * 4]),
+             version=np.array(version))
+    # Same second mtimes are possible on some filesystems, make the change visible
+    os.utime(path, (os.path.getmtime(path) + 1,) * 2)
+
+
+def test_table_appearing_later_is_used(tmp_path):
+    path = str(tmp_path / "table.npz")
+    assert forecast_table.load("k", path) == {}
+
+    write_table(path, forecast_table.table_version("k"), 101.0)
+    assert forecast_table.load("k", path)["forecast"][0, 0] == 101.0
+
+
+def test_rebuilt_table_and_new_version_are_rechecked(tmp_path):
+    path = str(tmp_path / "table.npz")
+    write_table(path, forecast_table.table_version("k"), 101.0)
+    assert forecast_table.load("k", path)["forecast"][0, 0] == 101.0
+
+    write_table(path, forecast_table.table_version("k"), 102.0)
+    assert forecast_table.load("k", path)["forecast"][0, 0] == 102.0
+
+    # New data, the table on disk is stale
+    assert forecast_table.load("other", path) == {}
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from pynecone import loan_engine
+
+
+def legacy_payments(installment_payment, start_offset, installment_months, predicted_inflation):
+    # The calculate_real_loan loop from before the vectorized engine
+    paid_months = min(installment_months, max(len(predicted_inflation) - start_offset, 0))
+    payments = []
+    for i in range(paid_months):
+        previous = payments[-1] if payments else installment_payment
+        payments.append(previous * ((100 - predicted_inflation[start_offset + i]) / 100))
+    return payments
+
+
+def legacy_total(loans, predicted_inflation):
+    # The create_figure_one loop, without the monthly expenses
+    total = [0.0] * len(predicted_inflation)
+    for installment_payment, start_offset, installment_months in loans:
+        payments = legacy_payments(
+            installment_payment, start_offset, installment_months, predicted_inflation)
+        for j, payment in enumerate(payments):
+            total[start_offset + j] += payment
+    return total
+
+
+def portfolio(seed, count, horizon):
+    rng = np.random.default_rng(seed)
+    return list(zip(rng.uniform(100, 3000, count),
+                    rng.integers(0, horizon, count),
+                    rng.integers(1, 2 * horizon, count)))
+
+
+@pytest.mark.parametrize("seed, count, horizon", [(0, 1, 12), (1, 5, 60), (2, 30, 240)])
+def test_real_loan_payments_match_the_loops(seed, count, horizon):
+    loans = portfolio(seed, count, horizon)
+    inflation = np.random.default_rng(seed).normal(0.2, 0.3, horizon)
+    payments, total = loan_engine.real_loan_payments(*zip(*loans), inflation)
+
+    for row, loan in zip(payments, loans):
+        expected = legacy_payments(*loan, inflation)
+        np.testing.assert_allclose(row[:len(expected)], expected, rtol=1e-12, atol=0)
+        assert not row[len(expected):].any()
+    np.testing.assert_allclose(total, legacy_total(loans, inflation), rtol=1e-12, atol=1e-9)
+
+
+@pytest.mark.parametrize("seed, count, horizon", [(3, 1, 12), (4, 8, 120)])
+def test_real_loan_totals_match_the_loops_for_every_path(seed, count, horizon):
+    loans = portfolio(seed, count, horizon)
+    paths = np.random.default_rng(seed).normal(0.2, 0.3, (16, horizon))
+    installment_payment, start_offset, installment_months = map(np.array, zip(*loans))
+    loan_lengths = np.minimum(installment_months, horizon - start_offset)
+
+    totals = loan_engine.real_loan_totals(
+        installment_payment, start_offset, loan_lengths, paths)
+
+    for path, total in zip(paths, totals):
+        np.testing.assert_allclose(total, legacy_total(loans, path), rtol=1e-12, atol=1e-9)
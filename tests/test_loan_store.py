@@ -0,0 +1,37 @@
+from pynecone import loan_store
+
+CSV = """name,sym,loan,interest,installment
+Car, 2023/03, 50000, 3, 60
+
+House,2024/01,400000,4,360
+"""
+
+
+def test_parse_csv_skips_the_header_and_blank_lines():
+    loans, errors = loan_store.parse_csv(CSV)
+
+    assert errors == []
+    assert loans == [
+        {"name": "Car", "sym": "2023/03", "loan": "50000", "interest": "3", "installment": "60"},
+        {"name": "House", "sym": "2024/01", "loan": "400000", "interest": "4",
+         "installment": "360"},
+    ]
+
+
+def test_parse_csv_reports_bad_rows_and_keeps_the_rest():
+    loans, errors = loan_store.parse_csv(
+        "Car,2023/03,50000,3,60\n"
+        "Bike,2023/05,3000\n"
+        "Boat,2023-05,3000,2,12\n"
+        "Land,2023/05,lots,2,12\n"
+        "Gift,2023/05,3000,2,0\n")
+
+    assert [loan["name"] for loan in loans] == ["Car"]
+    assert [error.split(":")[0] for error in errors] == [
+        "Line 2", "Line 3", "Line 4", "Line 5"]
+    assert "expected 5 values, got 3" in errors[0]
+
+
+def test_parse_csv_of_nothing():
+    assert loan_store.parse_csv("") == ([], [])
+    assert loan_store.parse_csv("\n  \n") == ([], [])
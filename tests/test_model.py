@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.fixtures import write_fixtures
+from pynecone import datasets, model
+
+
+def test_model_inputs_stay_float64():
+    data = model.read_data()
+    model_columns = [*model.TREND_COLUMNS, *model.TREND_COLUMNS.values()]
+    assert (data[model_columns].dtypes == np.float64).all()
+
+
+def test_sub_indices_are_compact():
+    # The fixtures are published with one decimal, like DOSM
+    data = model.read_data()
+    assert data["ipi_mfg"].dtype == np.float32
+    assert data["ppi_water"].dtype == np.float32
+
+
+def test_downcast_keeps_published_values():
+    df = pd.DataFrame({
+        "published": [120.1, 98.7, np.nan, 15234.5],
+        "precise": [120.123456789, 98.7, 1.0, 2.0],
+    })
+    compact = model.downcast(df.copy())
+
+    assert compact["published"].dtype == np.float32
+    assert compact["precise"].dtype == np.float64
+    np.testing.assert_array_equal(
+        np.round(compact["published"].astype(np.float64), 1), df["published"])
+
+
+def test_read_gov_data_projection_and_range():
+    start, end = pd.Timestamp("2015-01-01"), pd.Timestamp("2016-12-01")
+    df = model.read_gov_data(model.URL_PPI, ["water", "overall"], start, end)
+
+    assert list(df.columns) == ["water", "overall"]
+    assert df.index.min() == start and df.index.max() == end
+    assert len(df) == 24
+
+
+@pytest.fixture
+def own_sources(tmp_path, monkeypatch):
+    # Data of its own, the shared fixtures are read again afterwards
+    write_fixtures(str(tmp_path))
+    monkeypatch.setattr(datasets, "CACHE_DIR", str(tmp_path))
+    model.load_sources()
+    yield tmp_path
+    monkeypatch.undo()
+    model.load_sources()
+
+
+def test_new_snapshots_are_read_once_the_ttl_passed(own_sources, monkeypatch):
+    before = model.read_data()
+    write_fixtures(str(own_sources), seed=1)
+    assert model.read_data() is before
+
+    monkeypatch.setattr(datasets, "CACHE_TTL", 0)
+    after = model.read_data()
+    assert not after["cpi_overall"].equals(before["cpi_overall"])
+
+
+def test_a_manual_refresh_is_picked_up(own_sources):
+    before = model.read_data()
+    write_fixtures(str(own_sources), seed=1)
+    for url in datasets.ALL_URLS:
+        with open(datasets.cache_path(url), "rb") as f:
+            datasets.store_snapshot(url, f.read())
+
+    assert not model.read_data()["cpi_overall"].equals(before["cpi_overall"])
@@ -0,0 +1,64 @@
+import shutil
+
+import numpy as np
+import pytest
+
+from pynecone import model_bundle, model_registry
+
+COLUMNS = ["cpi_trend", "ppi_trend"]
+TARGET = ["cpi_overall"]
+HORIZONS = [3, 6]
+
+
+@pytest.fixture
+def model_path(tmp_path):
+    path = str(tmp_path / "model.h5")
+    shutil.copy(model_registry.MODEL_PATH, path)
+    return path
+
+
+def save(model_path):
+    return model_bundle.save(
+        model_bundle.Scaler([1.0, 2.0], [0.5, 4.0]), model_bundle.Scaler([3.0, 4.0], [2.0, 2.0]),
+        COLUMNS, TARGET, HORIZONS, model_path)
+
+
+def test_bundle_round_trip(model_path):
+    assert model_bundle.get(model_path) is None
+    save(model_path)
+
+    bundle = model_bundle.get(model_path)
+    bundle.check(COLUMNS, TARGET, HORIZONS)
+    np.testing.assert_allclose(bundle.scaler_x.transform([[2.0, 6.0]]), [[2.0, 1.0]])
+    np.testing.assert_allclose(bundle.scaler_y.inverse_transform([[1.0, 0.0]]), [[5.0, 4.0]])
+
+
+def test_bundle_of_another_model_is_refused(model_path):
+    save(model_path)
+    with open(model_path, "ab") as f:
+        f.write(b"retrained")
+
+    with pytest.raises(model_bundle.BundleMismatch):
+        model_bundle.get(model_path)
+
+
+def test_bundle_for_other_columns_is_refused(model_path):
+    save(model_path)
+
+    with pytest.raises(model_bundle.BundleMismatch):
+        model_bundle.get(model_path).check(COLUMNS[:1], TARGET, HORIZONS)
+
+
+def test_missing_bundle_refits_with_a_warning_unless_refused(model_path, monkeypatch):
+    from pynecone import model
+
+    monkeypatch.setattr(model_registry, "MODEL_PATH", model_path)
+    monkeypatch.setattr(model_bundle, "ALLOW_REFIT", False)
+    with pytest.raises(model_bundle.MissingBundle):
+        model.get_scalers()
+
+    monkeypatch.setattr(model_bundle, "ALLOW_REFIT", True)
+    model._refit_scalers.cache_clear()
+    with pytest.warns(RuntimeWarning, match="refitting the scalers"):
+        scaler_x, _ = model.get_scalers()
+    assert len(scaler_x.mean_) == len(model.input_columns)
@@ -0,0 +1,19 @@
+import numpy as np
+import pytest
+
+from pynecone import model_registry, numpy_model
+
+TOLERANCE = 1e-4
+
+
+def test_numpy_export_matches_keras():
+    pytest.importorskip("tensorflow")
+
+    keras_model = model_registry.get_model(model_registry.MODEL_PATH)
+    numpy_forward = numpy_model.get(model_registry.MODEL_PATH)
+    assert numpy_forward is not None, "export is missing or stale, run python -m pynecone.numpy_model"
+
+    rng = np.random.default_rng(0)
+    inputs = rng.normal(size=(1000, numpy_forward.layers[0][0].shape[0])).astype(np.float32)
+    difference = np.abs(keras_model.predict(inputs, verbose=0) - numpy_forward.predict(inputs))
+    assert difference.max() < TOLERANCE
@@ -0,0 +1,81 @@
+import numpy as np
+
+from pynecone import simulation
+
+LOANS = [
+    simulation.Loan("Car", 2023, 3, 24, 900.0),
+    simulation.Loan("House", 2024, 1, 120, 2500.0),
+]
+# Starts after the first loan and ends before the last, the span stays the same
+BIKE = simulation.Loan("Bike", 2023, 6, 12, 300.0)
+# Ends after every other loan
+LAND = simulation.Loan("Land", 2025, 1, 240, 1200.0)
+
+FIELDS = ["predicted_inflation", "start_offset", "loan_lengths",
+          "real_payments", "real_loan_total", "real_income", "real_expenses"]
+
+
+def forecast(start_year, start_month, num_of_months):
+    # Differs month to month, and a longer forecast starts with the shorter one
+    return 0.2 + 0.1 * np.sin(np.arange(num_of_months) / 5)
+
+
+def assert_same_simulation(sim, expected):
+    assert sim.months == expected.months
+    for field in FIELDS:
+        np.testing.assert_allclose(getattr(sim, field), getattr(expected, field),
+                                   rtol=0, atol=1e-12, err_msg=field)
+
+
+def test_simulator_drops_caches_when_the_version_changes():
+    version = {"value": "a", "inflation": 0.2}
+
+    def forecast(start_year, start_month, num_of_months):
+        return [version["inflation"]] * num_of_months
+
+    simulator = simulation.Simulator(forecast, version=lambda: version["value"])
+    first = simulator.simulate(LOANS, 8000, 3000)
+
+    # Same version, the cached forecast is reused even though it would differ now
+    version["inflation"] = 0.5
+    np.testing.assert_array_equal(
+        simulator.simulate(LOANS, 8000, 3000).real_expenses, first.real_expenses)
+
+    version["value"] = "b"
+    fresh = simulation.simulate(LOANS, 8000, 3000, forecast)
+    np.testing.assert_allclose(
+        simulator.simulate(LOANS, 8000, 3000).real_expenses, fresh.real_expenses)
+    assert not np.allclose(fresh.real_expenses, first.real_expenses)
+
+
+def test_adding_or_removing_a_loan_only_computes_that_loan():
+    simulator = simulation.Simulator(forecast)
+    simulator.simulate(LOANS, 8000, 3000)
+    assert simulator.stats["loan_misses"] == 2
+
+    simulator.simulate(LOANS + [BIKE], 8000, 3000)
+    assert simulator.stats["loan_misses"] == 3
+
+    simulator.simulate(LOANS[1:] + [BIKE], 8000, 3000)
+    assert simulator.stats["loan_misses"] == 3
+    assert simulator.stats["forecasts"] == 1
+
+
+def test_only_a_longer_span_forecasts_again():
+    simulator = simulation.Simulator(forecast)
+    simulator.simulate(LOANS, 8000, 3000)
+    simulator.simulate(LOANS + [BIKE], 8000, 3000)
+    simulator.simulate(LOANS[:1], 8000, 3000)
+    assert simulator.stats["forecasts"] == 1
+
+    simulator.simulate(LOANS + [LAND], 8000, 3000)
+    assert simulator.stats["forecasts"] == 2
+    simulator.simulate(LOANS, 8000, 3000)
+    assert simulator.stats["forecasts"] == 2
+
+
+def test_incremental_results_match_a_fresh_simulation():
+    simulator = simulation.Simulator(forecast)
+    for loans in [LOANS, LOANS + [BIKE], [BIKE], LOANS + [LAND], LOANS[1:] + [BIKE], LOANS]:
+        assert_same_simulation(simulator.simulate(loans, 8000, 3000),
+                               simulation.simulate(loans, 8000, 3000, forecast))
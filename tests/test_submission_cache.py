@@ -0,0 +1,16 @@
+from pynecone import submission_cache
+
+
+def loan(**fields):
+    return {"name": "car", "sym": "2023/01", "loan": "10000", "interest": "5",
+            "installment": "12", **fields}
+
+
+def test_same_terms_same_key():
+    assert submission_cache.submission_key(5000, 2000, [loan(interest="05")]) == \
+        submission_cache.submission_key(5000, 2000, [loan()])
+
+
+def test_loans_that_do_not_parse_have_no_key():
+    for bad in [loan(installment="0"), loan(loan="ten"), {"name": "car"}]:
+        assert submission_cache.submission_key(5000, 2000, [bad]) is None